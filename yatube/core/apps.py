@@ -1,5 +1,17 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from .db import tune_sqlite
+
+        connection_created.connect(tune_sqlite)
+        if settings.MEMORY_DIAGNOSTICS_ENABLED:
+            from . import memory
+
+            memory.start(settings.MEMORY_DIAGNOSTICS_FRAMES)
+            memory.install_signal_handler()
@@ -0,0 +1,138 @@
+import pickle
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+class TwoTierCache(BaseCache):
+    """Bounded in-process LRU (L1) in front of a shared cache (L2).
+
+    Every value written to L2 carries a random stamp, which is also kept
+    under its own small key. An L1 entry is trusted for ``L1_TIMEOUT``
+    seconds; after that only the stamp is fetched from L2, and the value is
+    reloaded when another process has changed or deleted it.
+
+    OPTIONS: ``L2`` - alias of the shared cache, ``L1_TIMEOUT`` - seconds,
+    ``MAX_ENTRIES`` - size of the LRU.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._l2_alias = options.get('L2', location)
+        self._l1_timeout = options.get('L1_TIMEOUT', 2)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    @property
+    def l2(self):
+        return caches[self._l2_alias]
+
+    @staticmethod
+    def stamp_key(key):
+        return f'{key}:stamp'
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _remember(self, key, stamp, expires, value):
+        with self._lock:
+            self._cache[key] = (
+                pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+                stamp, expires, time.time()
+            )
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._max_entries:
+                self._cache.popitem(last=False)
+
+    def _forget(self, key):
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def _local(self, key, version):
+        local_key = self.make_key(key, version)
+        now = time.time()
+        with self._lock:
+            entry = self._cache.get(local_key)
+            if entry is not None:
+                self._cache.move_to_end(local_key)
+        if entry is None:
+            return None
+        pickled, stamp, expires, checked = entry
+        if expires is not None and expires <= now:
+            self._forget(local_key)
+            return None
+        if now - checked >= self._l1_timeout:
+            if self.l2.get(self.stamp_key(key), version=version) != stamp:
+                self._forget(local_key)
+                return None
+            with self._lock:
+                if local_key in self._cache:
+                    self._cache[local_key] = (pickled, stamp, expires, now)
+        return entry
+
+    def get(self, key, default=None, version=None):
+        self.validate_key(self.make_key(key, version))
+        entry = self._local(key, version)
+        if entry is not None:
+            self._count('l1_hits')
+            return pickle.loads(entry[0])
+        self._count('l1_misses')
+        packed = self.l2.get(key, version=version)
+        if packed is None:
+            self._count('l2_misses')
+            return default
+        self._count('l2_hits')
+        stamp, expires, value = packed
+        self._remember(self.make_key(key, version), stamp, expires, value)
+        return value
+
+    def _write(self, method, key, value, timeout, version):
+        stamp = uuid.uuid4().hex
+        expires = self.get_backend_timeout(timeout)
+        written = getattr(self.l2, method)(
+            key, (stamp, expires, value), timeout, version=version
+        )
+        if written is False:
+            return False
+        self.l2.set(self.stamp_key(key), stamp, timeout, version=version)
+        self._remember(self.make_key(key, version), stamp, expires, value)
+        return True
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.validate_key(self.make_key(key, version))
+        return self._write('add', key, value, timeout, version)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.validate_key(self.make_key(key, version))
+        self._write('set', key, value, timeout, version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self._forget(self.make_key(key, version))
+        self.l2.touch(self.stamp_key(key), timeout, version=version)
+        return self.l2.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self._forget(self.make_key(key, version))
+        self.l2.delete_many([key, self.stamp_key(key)], version=version)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+        self.l2.clear()
+
+    def hit_ratios(self):
+        with self._lock:
+            stats = dict(self.stats)
+        ratios = {}
+        for tier in ('l1', 'l2'):
+            hits = stats.get(f'{tier}_hits', 0)
+            total = hits + stats.get(f'{tier}_misses', 0)
+            ratios[tier] = hits / total if total else None
+        return {'counters': stats, 'hit_ratios': ratios}
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.db import connections
+
+
+def tune_sqlite(sender, connection, **kwargs):
+    """Apply SQLITE_PRAGMAS to every new SQLite connection."""
+    if connection.vendor != 'sqlite':
+        return
+    for pragma, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {pragma} = {value}')
+
+
+def delete_rows(model, using, values, field='pk'):
+    """Delete the rows of ``model`` whose ``field`` is in ``values``.
+
+    A single DELETE statement: unlike QuerySet.delete() no rows are
+    fetched first and no signals are sent, so callers apply the side
+    effects of the deletion themselves. Returns the number of rows.
+    """
+    values = list(values)
+    if not values:
+        return 0
+    connection = connections[using]
+    if field == 'pk':
+        column = model._meta.pk.column
+    else:
+        column = model._meta.get_field(field).column
+    placeholders = ', '.join(['%s'] * len(values))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {connection.ops.quote_name(model._meta.db_table)}'
+            f' WHERE {connection.ops.quote_name(column)} IN ({placeholders})',
+            values
+        )
+        return cursor.rowcount
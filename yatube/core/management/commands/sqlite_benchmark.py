@@ -0,0 +1,126 @@
+import os
+import random
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Measures view throughput of concurrent writers and readers on '
+            'a throwaway SQLite file, with stock and tuned settings.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        database = connections.databases['default']
+        original = dict(database)
+        rounds = (
+            ('stock', {}, 0),
+            ('tuned', settings.SQLITE_PRAGMAS,
+             original.get('CONN_MAX_AGE', 0)),
+        )
+        try:
+            for label, pragmas, max_age in rounds:
+                # Every row goes to the temporary database only.
+                with tempfile.TemporaryDirectory() as directory, \
+                        override_settings(
+                            SQLITE_PRAGMAS=pragmas, DEBUG=False,
+                            POST_SHARDS=[], DATABASE_REPLICAS=[],
+                            POST_ARCHIVE_DATABASE='default',
+                            WRITE_BEHIND_ENABLED=False,
+                            PAGE_CACHE_ENABLED=False):
+                    connections['default'].close()
+                    database.update(
+                        NAME=os.path.join(directory, 'benchmark.sqlite3'),
+                        CONN_MAX_AGE=max_age,
+                    )
+                    call_command('migrate', verbosity=0)
+                    result = self.run_round(options)
+                    connections['default'].close()
+                self.stdout.write(
+                    f'{label}: {result["writes"]:.1f} writes/s, '
+                    f'{result["reads"]:.1f} reads/s, '
+                    f'{result["errors"]} errors'
+                )
+        finally:
+            connections['default'].close()
+            database.clear()
+            database.update(original)
+
+    def run_round(self, options):
+        authors = [
+            User.objects.create_user(username=f'writer{number}')
+            for number in range(options['writers'])
+        ]
+        post_ids = [
+            Post.objects.create(author=author, text='benchmark').pk
+            for author in authors
+        ]
+        self.counters = {'writes': 0, 'reads': 0, 'errors': 0}
+        self.lock = threading.Lock()
+        self.deadline = time.monotonic() + options['seconds']
+        read_urls = [reverse('posts:index')] + [
+            reverse('posts:profile', args=[author.username])
+            for author in authors
+        ] + [
+            reverse('posts:post_detail', args=[post_id])
+            for post_id in post_ids
+        ]
+        threads = [
+            threading.Thread(target=self.writer, args=(author, post_ids))
+            for author in authors
+        ] + [
+            threading.Thread(target=self.reader, args=(read_urls,))
+            for _ in range(options['readers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return {
+            'writes': self.counters['writes'] / options['seconds'],
+            'reads': self.counters['reads'] / options['seconds'],
+            'errors': self.counters['errors'],
+        }
+
+    def request(self, method, url, key, data=None):
+        try:
+            method(url, data)
+        except OperationalError:
+            key = 'errors'
+        close_old_connections()
+        with self.lock:
+            self.counters[key] += 1
+
+    def writer(self, author, post_ids):
+        client = Client()
+        client.force_login(author)
+        while time.monotonic() < self.deadline:
+            if random.random() < 0.5:
+                url = reverse('posts:post_create')
+            else:
+                url = reverse('posts:add_comment',
+                              args=[random.choice(post_ids)])
+            self.request(client.post, url, 'writes', {'text': 'benchmark'})
+        connections.close_all()
+
+    def reader(self, urls):
+        client = Client()
+        while time.monotonic() < self.deadline:
+            self.request(client.get, random.choice(urls), 'reads')
+        connections.close_all()
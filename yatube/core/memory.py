@@ -0,0 +1,122 @@
+import json
+import logging
+import os
+import signal
+import tracemalloc
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template import engines
+
+logger = logging.getLogger(__name__)
+
+_baseline = None
+
+
+def start(frames=1):
+    global _baseline
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+    _baseline = take_snapshot()
+
+
+def reset_baseline():
+    global _baseline
+    _baseline = take_snapshot() if tracemalloc.is_tracing() else None
+
+
+def take_snapshot():
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<unknown>'),
+    ))
+
+
+def top_allocations(limit=10):
+    if not tracemalloc.is_tracing():
+        return []
+    snapshot = take_snapshot()
+    if _baseline is not None:
+        stats = snapshot.compare_to(_baseline, 'lineno')
+    else:
+        stats = snapshot.statistics('lineno')
+    return [
+        {
+            'site': str(stat.traceback[0]),
+            'size': stat.size,
+            'size_diff': getattr(stat, 'size_diff', stat.size),
+            'count': stat.count,
+            'count_diff': getattr(stat, 'count_diff', stat.count),
+        }
+        for stat in stats[:limit]
+    ]
+
+
+def cache_sizes():
+    from sorl.thumbnail.conf import settings as thumbnail_settings
+
+    sizes = {}
+    for alias in settings.CACHES:
+        store = getattr(caches[alias], '_cache', None)
+        if not isinstance(store, dict):
+            continue
+        sizes[alias] = {
+            'entries': len(store),
+            'thumbnail_entries': sum(
+                thumbnail_settings.THUMBNAIL_KEY_PREFIX in key
+                for key in list(store)
+            ),
+        }
+    return sizes
+
+
+def template_cache_sizes():
+    sizes = {}
+    for engine in engines.all():
+        loaders = getattr(engine, 'engine', None)
+        if loaders is None:
+            continue
+        for loader in loaders.template_loaders:
+            if hasattr(loader, 'get_template_cache'):
+                sizes[engine.name] = len(loader.get_template_cache)
+    return sizes
+
+
+def report(limit=10):
+    current, peak = (
+        tracemalloc.get_traced_memory() if tracemalloc.is_tracing()
+        else (0, 0)
+    )
+    return {
+        'tracing': tracemalloc.is_tracing(),
+        'has_baseline': _baseline is not None,
+        'traced_current': current,
+        'traced_peak': peak,
+        'top': top_allocations(limit),
+        'caches': cache_sizes(),
+        'templates': template_cache_sizes(),
+    }
+
+
+def dump(signum=None, frame=None):
+    data = report(settings.MEMORY_DIAGNOSTICS_TOP)
+    os.makedirs(settings.MEMORY_DIAGNOSTICS_DUMP_DIR, exist_ok=True)
+    filename = os.path.join(
+        settings.MEMORY_DIAGNOSTICS_DUMP_DIR,
+        f'{os.getpid()}-{datetime.now():%Y%m%d-%H%M%S}.json'
+    )
+    with open(filename, 'w') as dump_file:
+        json.dump(data, dump_file, indent=2)
+    logger.warning('Memory snapshot of pid %s saved to %s',
+                   os.getpid(), filename)
+    return filename
+
+
+def install_signal_handler(signum=signal.SIGUSR1):
+    try:
+        signal.signal(signum, dump)
+    except ValueError:
+        # Not the main thread of the interpreter, e.g. a threaded dev server.
+        logger.info('Memory dump signal handler was not installed')
@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+
+from . import routers
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class PrimaryPinMiddleware:
+    """Keeps a client on the primary database for a while after a write."""
+
+    cookie_name = 'primary_pin'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            pinned_until = float(request.COOKIES.get(self.cookie_name, 0))
+        except ValueError:
+            pinned_until = 0
+        routers.pin_to_primary(
+            request.method not in SAFE_METHODS or pinned_until > time.time()
+        )
+        try:
+            response = self.get_response(request)
+            wrote = routers.has_written()
+        finally:
+            routers.pin_to_primary(False)
+        if wrote or request.method not in SAFE_METHODS:
+            response.set_cookie(
+                self.cookie_name,
+                str(time.time() + settings.REPLICA_STICKY_SECONDS),
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+            )
+        return response
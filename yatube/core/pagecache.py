@@ -0,0 +1,100 @@
+"""Full-response cache for anonymous GET requests.
+
+Pages are fresh for the TTL of their URL name in PAGE_CACHE_TTLS, then
+served stale for PAGE_CACHE_STALE more seconds while a worker thread
+renders a new copy. Any change of the models listed in posts.signals
+bumps a generation number that is part of every key.
+"""
+import hashlib
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import close_old_connections
+from django.urls import Resolver404, resolve
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = 'page_cache.generation'
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.PAGE_CACHE_REFRESH_WORKERS,
+    thread_name_prefix='page-cache'
+)
+
+
+def invalidate():
+    cache.set(GENERATION_KEY, uuid.uuid4().hex, None)
+
+
+def page_key(request):
+    generation = cache.get(GENERATION_KEY, 0)
+    url = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'page_cache.{generation}.{request.method}.{url}'
+
+
+def page_ttl(request):
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return None
+    return settings.PAGE_CACHE_TTLS.get(
+        ':'.join([*match.app_names, match.url_name])
+    )
+
+
+def is_cacheable(request):
+    return (
+        settings.PAGE_CACHE_ENABLED
+        and request.method in ('GET', 'HEAD')
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+    )
+
+
+class AnonymousPageCacheMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        ttl = page_ttl(request) if is_cacheable(request) else None
+        if ttl is None:
+            return self.get_response(request)
+        key = page_key(request)
+        entry = cache.get(key)
+        if entry is None:
+            response = self.render(request, key, ttl)
+            response['X-Page-Cache'] = 'miss'
+            return response
+        response, stored = entry
+        if time.time() - stored < ttl:
+            response['X-Page-Cache'] = 'hit'
+            return response
+        if cache.add(f'{key}.refresh', 1, settings.PAGE_CACHE_STALE):
+            executor.submit(self.refresh, request.META.copy(), key, ttl)
+        response['X-Page-Cache'] = 'stale'
+        return response
+
+    def render(self, request, key, ttl):
+        response = self.get_response(request)
+        if response.status_code == 200 and not response.cookies and (
+            not response.streaming
+        ):
+            cache.set(
+                key, (response, time.time()), ttl + settings.PAGE_CACHE_STALE
+            )
+        return response
+
+    def refresh(self, meta, key, ttl):
+        try:
+            self.render(WSGIRequest({**meta, 'wsgi.input': BytesIO()}),
+                        key, ttl)
+        except Exception:
+            logger.exception('Background page refresh failed')
+        finally:
+            cache.delete(f'{key}.refresh')
+            close_old_connections()
@@ -0,0 +1,47 @@
+import random
+import threading
+
+from django.conf import settings
+
+_state = threading.local()
+
+
+def pin_to_primary(pinned=True):
+    _state.pinned = pinned
+    _state.wrote = False
+
+
+def is_pinned():
+    return getattr(_state, 'pinned', False)
+
+
+def has_written():
+    return getattr(_state, 'wrote', False)
+
+
+class PrimaryReplicaRouter:
+    """Reads go to a replica from DATABASE_REPLICAS, writes go to default.
+
+    Once something is written, the rest of the request (and, through
+    PrimaryPinMiddleware, the next few seconds of the client) reads from
+    the primary too, so users always see their own posts and comments.
+    """
+
+    primary = 'default'
+
+    def db_for_read(self, model, **hints):
+        if not settings.DATABASE_REPLICAS or is_pinned():
+            return self.primary
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        _state.pinned = True
+        _state.wrote = True
+        return self.primary
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every configured alias but the post shards holds the same data.
+        pool = set(settings.DATABASES) - set(settings.POST_SHARDS)
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
@@ -0,0 +1,99 @@
+"""Single-flight recomputation of expensive cached values.
+
+Entries are stored together with the time their last computation took
+and their soft expiry. Shortly before the soft expiry a request may
+volunteer to refresh the value early (probabilistic early expiration),
+and once it has expired only the request holding the lock recomputes it
+while everybody else keeps getting the stale value for up to
+SINGLE_FLIGHT_GRACE more seconds.
+"""
+import hashlib
+import math
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+
+POLL_INTERVAL = 0.05
+
+
+def lock_key(key):
+    return f'{key}:lock'
+
+
+def is_fresh(delta, expires, beta):
+    jitter = delta * beta * math.log(1 - random.random())
+    return time.time() - jitter < expires
+
+
+def compute_and_store(cache, key, compute, timeout):
+    started = time.time()
+    value = compute()
+    delta = time.time() - started
+    cache.set(
+        key, (value, delta, time.time() + timeout),
+        timeout + settings.SINGLE_FLIGHT_GRACE
+    )
+    return value
+
+
+def get_or_compute(cache, key, compute, timeout, beta=None):
+    beta = settings.SINGLE_FLIGHT_BETA if beta is None else beta
+    lock_timeout = settings.SINGLE_FLIGHT_LOCK_TIMEOUT
+    entry = cache.get(key)
+    if entry is not None and is_fresh(entry[1], entry[2], beta):
+        return entry[0]
+    deadline = time.time() + lock_timeout
+    while not cache.add(lock_key(key), 1, lock_timeout):
+        if entry is not None:
+            return entry[0]
+        # Nothing stale to serve: wait for the lock holder for a while.
+        if time.time() > deadline:
+            return compute()
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+    try:
+        return compute_and_store(cache, key, compute, timeout)
+    finally:
+        cache.delete(lock_key(key))
+
+
+def single_flight_view(timeout, cache_alias='default'):
+    """Cache successful GET responses of a view per URL and user."""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            url = hashlib.md5(request.get_full_path().encode()).hexdigest()
+            key = (f'views.single_flight.{view.__module__}.{view.__name__}.'
+                   f'{request.user.pk or 0}.{url}')
+
+            def compute():
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    raise UncacheableResponse(response)
+                if hasattr(response, 'render'):
+                    response.render()
+                return response
+
+            try:
+                return get_or_compute(caches[cache_alias], key, compute,
+                                      timeout)
+            except UncacheableResponse as error:
+                return error.response
+
+        return wrapper
+
+    return decorator
+
+
+class UncacheableResponse(Exception):
+    def __init__(self, response):
+        super().__init__(response.status_code)
+        self.response = response
@@ -0,0 +1,63 @@
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.template import Library, TemplateSyntaxError, VariableDoesNotExist
+from django.templatetags.cache import CacheNode
+
+from ..stampede import get_or_compute
+
+register = Library()
+
+
+class SingleFlightCacheNode(CacheNode):
+    def get_cache(self, context):
+        if not self.cache_name:
+            try:
+                return caches['template_fragments']
+            except InvalidCacheBackendError:
+                return caches['default']
+        try:
+            return caches[self.cache_name.resolve(context)]
+        except (InvalidCacheBackendError, VariableDoesNotExist):
+            raise TemplateSyntaxError(
+                'Invalid cache name specified for single_flight_cache tag'
+            )
+
+    def render(self, context):
+        try:
+            expire_time = int(self.expire_time_var.resolve(context))
+        except (VariableDoesNotExist, ValueError, TypeError):
+            raise TemplateSyntaxError(
+                '"single_flight_cache" tag needs an integer timeout'
+            )
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        return get_or_compute(
+            self.get_cache(context),
+            make_template_fragment_key(self.fragment_name, vary_on),
+            lambda: self.nodelist.render(context),
+            expire_time
+        )
+
+
+@register.tag
+def single_flight_cache(parser, token):
+    """Same arguments as {% cache %}, but an expired fragment is rebuilt
+    by one request at a time while the others get the stale copy.
+
+        {% single_flight_cache 20 index_page page %}
+            ...
+        {% endsingle_flight_cache %}
+    """
+    nodelist = parser.parse(('endsingle_flight_cache',))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    if len(tokens) < 3:
+        raise TemplateSyntaxError(
+            f'{tokens[0]!r} tag requires at least 2 arguments.'
+        )
+    cache_name = None
+    if len(tokens) > 3 and tokens[-1].startswith('using='):
+        cache_name = parser.compile_filter(tokens.pop()[len('using='):])
+    return SingleFlightCacheNode(
+        nodelist, parser.compile_filter(tokens[1]), tokens[2],
+        [parser.compile_filter(token) for token in tokens[3:]], cache_name
+    )
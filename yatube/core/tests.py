@@ -1,6 +1,24 @@
+import time
+import tracemalloc
 from http import HTTPStatus
 
-from django.test import TestCase
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+from . import memory, stampede
+from .cache import TwoTierCache
+from .versions import get_version, get_versions
+
+User = get_user_model()
 
 
 class ViewTestClass(TestCase):
@@ -8,3 +26,188 @@ class ViewTestClass(TestCase):
         response = self.client.get('/noneexist-page/')
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
         self.assertTemplateUsed(response, 'core/404.html')
+
+
+class MemoryDiagnosticsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.user = User.objects.create_user(username='user')
+
+    def setUp(self):
+        self.was_tracing = tracemalloc.is_tracing()
+        memory.start()
+
+    def tearDown(self):
+        if not self.was_tracing:
+            tracemalloc.stop()
+
+    def test_memory_report_for_staff(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('core:memory') + '?limit=3')
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        data = response.json()
+        self.assertTrue(data['tracing'])
+        self.assertLessEqual(len(data['top']), 3)
+        self.assertIn('default', data['caches'])
+
+    def test_memory_report_hidden_from_users(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('core:memory'))
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTest(TestCase):
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(author=cls.author, text='Тестовый пост')
+
+    def test_reads_go_to_replica(self):
+        response = Client().get(
+            reverse('posts:profile', args=[self.author.username])
+        )
+        self.assertEqual(
+            response.status_code, HTTPStatus.NOT_FOUND,
+            'Чтение должно идти в реплику, которая ещё не догнала primary'
+        )
+
+    def test_client_sticks_to_primary_after_write(self):
+        client = Client()
+        client.force_login(self.author)
+        response = client.post(
+            reverse('posts:add_comment', args=[self.post.id]),
+            {'text': 'Комментарий'}
+        )
+        self.assertIn('primary_pin', response.cookies)
+        response = client.get(
+            reverse('posts:profile', args=[self.author.username])
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+
+class SQLiteTuningTest(TestCase):
+    def test_pragmas_applied_to_connection(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            busy_timeout = cursor.fetchone()[0]
+            cursor.execute('PRAGMA synchronous')
+            synchronous = cursor.fetchone()[0]
+        self.assertEqual(busy_timeout, settings.SQLITE_PRAGMAS['busy_timeout'])
+        self.assertEqual(synchronous, 1, 'Ожидался synchronous=NORMAL')
+
+
+class TwoTierCacheTest(TestCase):
+    def make_process_cache(self, **options):
+        return TwoTierCache('', {'OPTIONS': {'L2': 'shared', **options}})
+
+    def setUp(self):
+        self.first = self.make_process_cache(L1_TIMEOUT=0)
+        self.second = self.make_process_cache(L1_TIMEOUT=0)
+        self.first.clear()
+
+    def test_values_shared_through_l2(self):
+        self.first.set('key', 'value')
+        self.assertEqual(self.second.get('key'), 'value')
+        self.assertEqual(self.second.get('key'), 'value')
+        self.assertEqual(self.second.stats['l2_hits'], 1)
+        self.assertEqual(self.second.stats['l1_hits'], 1)
+
+    def test_stamps_invalidate_other_processes(self):
+        self.first.set('key', 'old')
+        self.second.get('key')
+        self.first.set('key', 'new')
+        self.assertEqual(self.second.get('key'), 'new')
+        self.first.delete('key')
+        self.assertIsNone(self.second.get('key'))
+
+    def test_l1_trusted_within_timeout(self):
+        patient = self.make_process_cache(L1_TIMEOUT=60)
+        self.first.set('key', 'old')
+        patient.get('key')
+        self.first.set('key', 'new')
+        self.assertEqual(patient.get('key'), 'old')
+
+    def test_l1_is_bounded(self):
+        small = self.make_process_cache(MAX_ENTRIES=2)
+        for key in ('a', 'b', 'c'):
+            small.set(key, key)
+        self.assertEqual(list(small._cache), [
+            small.make_key('b'), small.make_key('c')
+        ])
+        self.assertEqual(small.get('a'), 'a')
+
+    def test_hit_ratios_exported(self):
+        self.client.force_login(
+            User.objects.create_user(username='staff', is_staff=True)
+        )
+        response = self.client.get(reverse('core:cache'))
+        self.assertIn('hit_ratios', response.json()['default'])
+
+
+class CacheVersionsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_lost_versions_are_replaced_once(self):
+        cache.set('kept', 1, None)
+        new_versions = iter([2, 3])
+        self.assertEqual(
+            get_versions(cache, ['kept', 'lost'], lambda: next(new_versions)),
+            {'kept': 1, 'lost': 2}
+        )
+        self.assertEqual(get_version(cache, 'lost', lambda: 4), 2)
+
+
+class SingleFlightTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return self.calls
+
+    def test_value_computed_once(self):
+        for _ in range(3):
+            value = stampede.get_or_compute(cache, 'key', self.compute, 20)
+        self.assertEqual(value, 1)
+        self.assertEqual(self.calls, 1)
+
+    def test_stale_value_served_while_locked(self):
+        cache.set('key', ('stale', 0.1, time.time() - 1), 60)
+        cache.add(stampede.lock_key('key'), 1)
+        value = stampede.get_or_compute(cache, 'key', self.compute, 20)
+        self.assertEqual(value, 'stale')
+        self.assertEqual(self.calls, 0)
+
+    def test_expired_value_recomputed_by_lock_holder(self):
+        cache.set('key', ('stale', 0.1, time.time() - 1), 60)
+        value = stampede.get_or_compute(cache, 'key', self.compute, 20)
+        self.assertEqual(value, 1)
+        self.assertIsNone(cache.get(stampede.lock_key('key')))
+
+    def test_template_tag(self):
+        template = Template(
+            '{% load single_flight %}'
+            '{% single_flight_cache 20 fragment %}{{ value }}'
+            '{% endsingle_flight_cache %}'
+        )
+        self.assertEqual(template.render(Context({'value': 'old'})), 'old')
+        self.assertEqual(template.render(Context({'value': 'new'})), 'old')
+
+    def test_view_decorator(self):
+        @stampede.single_flight_view(20)
+        def view(request):
+            return HttpResponse(str(self.compute()))
+
+        request = RequestFactory().get('/some/')
+        request.user = AnonymousUser()
+        for _ in range(2):
+            response = view(request)
+        self.assertEqual(response.content, b'1')
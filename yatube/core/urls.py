@@ -0,0 +1,10 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'core'
+
+urlpatterns = [
+    path('memory/', views.memory_diagnostics, name='memory'),
+    path('cache/', views.cache_stats, name='cache'),
+]
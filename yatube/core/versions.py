@@ -0,0 +1,24 @@
+"""Version stamps kept in the cache without an expiry.
+
+A version is replaced whenever the data it describes changes, and
+readers compare it with the version their copy was made at. The cache
+may still evict a version; the first reader to notice then stores a
+fresh one with add(), so concurrent readers agree on a single value.
+"""
+
+
+def get_versions(cache, keys, new_version):
+    """Return a dict of the versions under ``keys``.
+
+    Missing versions are replaced with ``new_version()``.
+    """
+    found = cache.get_many(keys)
+    for key in set(keys) - found.keys():
+        # A lost version makes the data look changed just now.
+        cache.add(key, new_version(), None)
+        found[key] = cache.get(key)
+    return found
+
+
+def get_version(cache, key, new_version):
+    return get_versions(cache, [key], new_version)[key]
@@ -1,7 +1,13 @@
 from http import HTTPStatus
 
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.cache import caches
+from django.http import JsonResponse
 from django.shortcuts import render
 
+from . import memory
+
 
 def page_not_found(request, exception):
     return render(
@@ -29,3 +35,21 @@ def server_error(request):
         'core/500.html',
         status=HTTPStatus.INTERNAL_SERVER_ERROR
     )
+
+
+@staff_member_required
+def memory_diagnostics(request):
+    if request.method == 'POST':
+        memory.reset_baseline()
+    limit = request.GET.get('limit', '')
+    limit = int(limit) if limit.isdigit() else 10
+    return JsonResponse(memory.report(limit))
+
+
+@staff_member_required
+def cache_stats(request):
+    return JsonResponse({
+        alias: caches[alias].hit_ratios()
+        for alias in settings.CACHES
+        if hasattr(caches[alias], 'hit_ratios')
+    })
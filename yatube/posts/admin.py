@@ -1,11 +1,81 @@
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin import helpers
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR, ChangeList
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.contrib.auth.admin import UserAdmin
+from django.core.paginator import Paginator
+from django.shortcuts import render
+from django.utils.functional import cached_property
 
-from .models import Post, Group
+from . import bulk, erasure, sharding
+from .catalog import catalog
+from .forms import ReassignGroupForm
+from .models import Comment, Group, Post, User, UserDeletion
+
+KEYSET_VAR = 'before'
+
+
+class GroupAutocompleteSelect(AutocompleteSelect):
+    """Autocomplete that labels the selected group from the catalog."""
+
+    def optgroups(self, name, value, attr=None):
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        for group_id in value:
+            if group_id in self.choices.field.empty_values:
+                continue
+            group = catalog.by_id(int(group_id))
+            if group is not None:
+                options.append(self.create_option(
+                    name, group.pk, str(group), True, len(options)
+                ))
+        return [(None, options, 0)]
+
+
+class CappedCountPaginator(Paginator):
+    """Counts no further than ADMIN_COUNT_LIMIT rows."""
+
+    @cached_property
+    def count(self):
+        limit = max(settings.ADMIN_COUNT_LIMIT, self.per_page + 1)
+        return self.object_list.order_by()[:limit].count()
+
+
+class KeysetChangeList(ChangeList):
+    """Changelist that also pages by primary key past the counted rows."""
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(KEYSET_VAR, None)
+        return lookup_params
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        before = self.params.get(KEYSET_VAR)
+        if not before:
+            return queryset
+        try:
+            return queryset.filter(pk__lt=int(before))
+        except ValueError:
+            raise IncorrectLookupParameters(before)
+
+    def get_results(self, request):
+        super().get_results(request)
+        self.keyset_query = None
+        results = list(self.result_list)
+        if len(results) == self.list_per_page and ORDER_VAR not in self.params:
+            self.keyset_query = self.get_query_string(
+                {KEYSET_VAR: results[-1].pk}, [PAGE_VAR]
+            )
 
 
 @admin.register(Group)
 class GroupAdmin(admin.ModelAdmin):
     list_display = ('pk', 'title', 'slug', 'description')
+    search_fields = ('title', 'slug')
 
 
 @admin.register(Post)
@@ -18,6 +88,147 @@ class PostAdmin(admin.ModelAdmin):
         'group'
     )
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
+    autocomplete_fields = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
+    ordering = ('-pk',)
+    paginator = CappedCountPaginator
+    show_full_result_count = False
     empty_value_display = '-пусто-'
+    actions = ('reassign_group', 'delete_posts', 'purge_authors')
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_actions(self, request):
+        # The stock action saves nothing but collects every related row.
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def reassign_group(self, request, queryset):
+        form = ReassignGroupForm(
+            request.POST if 'apply' in request.POST else None
+        )
+        if not form.is_valid():
+            return render(request, 'admin/posts/post/reassign_group.html', {
+                **self.admin_site.each_context(request),
+                'title': 'Перенос постов в другую группу',
+                'opts': self.model._meta,
+                'form': form,
+                'selected': request.POST.getlist(
+                    helpers.ACTION_CHECKBOX_NAME
+                ),
+                'select_across': request.POST.get('select_across', '0'),
+            })
+        moved = bulk.reassign_group(queryset, form.cleaned_data['group'])
+        self.message_user(request, f'Перенесено постов: {moved}')
+
+    reassign_group.short_description = 'Перенести в другую группу'
+    reassign_group.allowed_permissions = ('change',)
+
+    def delete_posts(self, request, queryset):
+        deleted = bulk.delete_posts(queryset)
+        self.message_user(request, f'Удалено постов: {deleted}')
+
+    delete_posts.short_description = 'Удалить выбранные посты'
+    delete_posts.allowed_permissions = ('delete',)
+
+    def purge_authors(self, request, queryset):
+        authors = sharding.values(queryset.select_related(None), 'author_id')
+        posts, comments = bulk.purge_authors(authors)
+        self.message_user(
+            request,
+            f'Удалено постов: {posts}, комментариев: {comments}'
+        )
+
+    purge_authors.short_description = (
+        'Удалить все посты и комментарии их авторов'
+    )
+    purge_authors.allowed_permissions = ('delete',)
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'group':
+            kwargs['widget'] = GroupAutocompleteSelect(
+                db_field.remote_field, self.admin_site,
+                using=kwargs.get('using')
+            )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+
+@admin.register(Comment)
+class CommentAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'text', 'created', 'author', 'post')
+    list_select_related = ('author', 'post')
+    autocomplete_fields = ('author', 'post')
+    search_fields = ('text',)
+    ordering = ('-pk',)
+    paginator = CappedCountPaginator
+    show_full_result_count = False
+    actions = ('delete_comments', 'purge_authors')
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def delete_comments(self, request, queryset):
+        deleted = bulk.delete_comments(queryset)
+        self.message_user(request, f'Удалено комментариев: {deleted}')
+
+    delete_comments.short_description = 'Удалить выбранные комментарии'
+    delete_comments.allowed_permissions = ('delete',)
+
+    def purge_authors(self, request, queryset):
+        authors = set(
+            queryset.select_related(None).values_list('author_id', flat=True)
+        )
+        posts, comments = bulk.purge_authors(authors)
+        self.message_user(
+            request,
+            f'Удалено постов: {posts}, комментариев: {comments}'
+        )
+
+    purge_authors.short_description = (
+        'Удалить все посты и комментарии их авторов'
+    )
+    purge_authors.allowed_permissions = ('delete',)
+
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class DeferredDeletionUserAdmin(UserAdmin):
+    """User admin that hands deletions over to posts.erasure."""
+
+    actions = ('schedule_deletion',)
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def get_deleted_objects(self, objs, request):
+        # The stock confirmation page collects every related row.
+        return [str(obj) for obj in objs], {}, set(), []
+
+    def delete_model(self, request, obj):
+        erasure.schedule(obj)
+
+    def schedule_deletion(self, request, queryset):
+        for user in queryset:
+            erasure.schedule(user)
+        self.message_user(
+            request, f'Запланировано удаление пользователей: {len(queryset)}'
+        )
+
+    schedule_deletion.short_description = 'Удалить в фоне'
+    schedule_deletion.allowed_permissions = ('delete',)
+
+
+@admin.register(UserDeletion)
+class UserDeletionAdmin(admin.ModelAdmin):
+    list_display = ('username', 'user_id', 'requested', 'finished')
+    readonly_fields = ('username', 'user_id', 'requested', 'finished')
@@ -0,0 +1,259 @@
+"""Read-only JSON API for posts, groups, profiles and comments.
+
+Collections are ordered by descending id and paginated with a
+``before=<id>`` cursor; ``fields=`` picks the serialized fields and
+``format=ndjson`` streams one object per line. Rows are read with
+``values().iterator()`` from every shard and the archive and merged on
+the id, so memory stays flat whatever ``limit`` is asked for.
+"""
+import heapq
+import json
+from http import HTTPStatus
+from itertools import islice
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
+
+from . import archive, catalog, sharding
+from .models import ArchivedComment, Comment, Post, User
+
+JSON = 'json'
+NDJSON = 'ndjson'
+CONTENT_TYPES = {
+    JSON: 'application/json',
+    NDJSON: 'application/x-ndjson',
+}
+
+POST_FIELDS = ('id', 'text', 'text_html', 'excerpt_html', 'pub_date',
+               'author_id', 'author', 'group_id', 'group', 'image')
+POST_DEFAULT_FIELDS = ('id', 'text', 'pub_date', 'author', 'group', 'image')
+COMMENT_FIELDS = ('id', 'post_id', 'author_id', 'author', 'text', 'created')
+COMMENT_DEFAULT_FIELDS = ('id', 'author', 'text', 'created')
+GROUP_FIELDS = ('id', 'title', 'slug', 'description')
+PROFILE_FIELDS = ('id', 'username', 'full_name', 'posts')
+
+# Fields computed from the row instead of being read as columns.
+DERIVED_COLUMNS = {'author': 'author_id', 'group': 'group_id'}
+
+
+class BadRequest(Exception):
+    pass
+
+
+def error(message):
+    return JsonResponse({'error': message}, status=HTTPStatus.BAD_REQUEST)
+
+
+def selected_fields(request, allowed, default):
+    fields = request.GET.get('fields')
+    if not fields:
+        return default
+    fields = tuple(dict.fromkeys(fields.split(',')))
+    unknown = set(fields) - set(allowed)
+    if unknown:
+        raise BadRequest(f'Unknown fields: {", ".join(sorted(unknown))}')
+    return fields
+
+
+def positive_int(request, name, default=None):
+    value = request.GET.get(name)
+    if value is None:
+        return default
+    if not value.isdigit() or not int(value):
+        raise BadRequest(f'{name} must be a positive integer')
+    return int(value)
+
+
+def page_limit(request, output):
+    limit = positive_int(request, 'limit')
+    if output == NDJSON:
+        return limit
+    return min(limit or settings.API_PAGE_SIZE, settings.API_MAX_PAGE_SIZE)
+
+
+def output_format(request):
+    output = request.GET.get('format', JSON)
+    if output not in CONTENT_TYPES:
+        raise BadRequest(f'Unknown format: {output}')
+    return output
+
+
+def columns(fields):
+    return list(dict.fromkeys(
+        DERIVED_COLUMNS.get(field, field) for field in ('id',) + fields
+    ))
+
+
+def newest_first(querysets, fields, before, limit):
+    """Rows of ``querysets`` merged by descending id, one chunk at a time."""
+    chunk_size = settings.API_CHUNK_SIZE
+    sources = []
+    for queryset in querysets:
+        if before is not None:
+            queryset = queryset.filter(pk__lt=before)
+        queryset = queryset.order_by('-pk').values(*columns(fields))
+        if limit is not None:
+            queryset = queryset[:limit]
+        sources.append(queryset.iterator(chunk_size=chunk_size))
+    rows = heapq.merge(*sources, key=itemgetter('id'), reverse=True)
+    return islice(rows, limit)
+
+
+def usernames(rows):
+    ids = {row['author_id'] for row in rows}
+    return dict(
+        User.objects.filter(pk__in=ids).values_list('pk', 'username')
+    )
+
+
+def serialize(rows, fields):
+    """Dictionaries with ``fields`` of ``rows``, resolved chunk by chunk."""
+    chunk_size = settings.API_CHUNK_SIZE
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        authors = usernames(chunk) if 'author' in fields else {}
+        for row in chunk:
+            item = {}
+            for field in fields:
+                if field == 'author':
+                    item[field] = authors.get(row['author_id'])
+                elif field == 'group':
+                    group = catalog.catalog.by_id(row['group_id'])
+                    item[field] = group.slug if group else None
+                elif field == 'image':
+                    name = row['image']
+                    item[field] = default_storage.url(name) if name else None
+                else:
+                    item[field] = row[field]
+            yield row['id'], item
+
+
+def dumps(item):
+    return json.dumps(item, cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+def json_stream(items, request, limit):
+    """A page of ``limit`` items; one more item only proves a next page."""
+    yield '{"results": ['
+    cursor = last_id = None
+    for sent, (item_id, item) in enumerate(items):
+        if sent == limit:
+            query = request.GET.copy()
+            query['before'] = last_id
+            cursor = request.build_absolute_uri(
+                f'{request.path}?{query.urlencode()}'
+            )
+            break
+        yield (',' if sent else '') + dumps(item)
+        last_id = item_id
+    yield f'], "next": {dumps(cursor)}}}'
+
+
+def ndjson_stream(items):
+    for _, item in items:
+        yield dumps(item) + '\n'
+
+
+def collection(request, querysets, allowed, default):
+    try:
+        output = output_format(request)
+        fields = selected_fields(request, allowed, default)
+        before = positive_int(request, 'before')
+        limit = page_limit(request, output)
+    except BadRequest as exception:
+        return error(str(exception))
+    if output == NDJSON:
+        rows = newest_first(querysets, fields, before, limit)
+        stream = ndjson_stream(serialize(rows, fields))
+    else:
+        rows = newest_first(querysets, fields, before, limit + 1)
+        stream = json_stream(serialize(rows, fields), request, limit)
+    return StreamingHttpResponse(stream, content_type=CONTENT_TYPES[output])
+
+
+def post_sources(**filters):
+    return sharding.querysets(Post.objects.filter(**filters)) + [
+        archive.posts().filter(**filters)
+    ]
+
+
+@require_GET
+def posts(request):
+    return collection(
+        request, post_sources(), POST_FIELDS, POST_DEFAULT_FIELDS
+    )
+
+
+@require_GET
+def group_posts(request, slug):
+    group = catalog.get_or_404(slug)
+    return collection(
+        request, post_sources(group_id=group.pk), POST_FIELDS,
+        POST_DEFAULT_FIELDS
+    )
+
+
+@require_GET
+def profile_posts(request, username):
+    author = get_object_or_404(User, username=username)
+    return collection(
+        request, post_sources(author_id=author.pk), POST_FIELDS,
+        POST_DEFAULT_FIELDS
+    )
+
+
+@require_GET
+def post_comments(request, post_id):
+    if sharding.posts_by_id(post_id).filter(pk=post_id).exists():
+        comments = Comment.objects.filter(post_id=post_id)
+        if sharding.is_enabled():
+            comments = comments.using(sharding.shard_for_post(post_id))
+    else:
+        get_object_or_404(archive.posts(), pk=post_id)
+        comments = ArchivedComment.objects.filter(post_id=post_id)
+    return collection(
+        request, [comments], COMMENT_FIELDS, COMMENT_DEFAULT_FIELDS
+    )
+
+
+@require_GET
+def groups(request):
+    try:
+        fields = selected_fields(request, GROUP_FIELDS, GROUP_FIELDS)
+    except BadRequest as exception:
+        return error(str(exception))
+    return JsonResponse({
+        'results': [
+            {field: getattr(group, field) for field in fields}
+            for group in catalog.catalog.all()
+        ]
+    }, json_dumps_params={'ensure_ascii': False})
+
+
+@require_GET
+def profile(request, username):
+    try:
+        fields = selected_fields(request, PROFILE_FIELDS, PROFILE_FIELDS)
+    except BadRequest as exception:
+        return error(str(exception))
+    author = get_object_or_404(User, username=username)
+    values = {
+        'id': author.pk,
+        'username': author.username,
+        'full_name': author.get_full_name(),
+    }
+    if 'posts' in fields:
+        values['posts'] = (
+            author.posts.count() + archive.count_for_author(author.pk)
+        )
+    return JsonResponse(
+        {field: values[field] for field in fields},
+        json_dumps_params={'ensure_ascii': False}
+    )
@@ -1,5 +1,22 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.models.signals import post_migrate
+
+
+def prepare_shard(sender, using, **kwargs):
+    from .sharding import prepare_shards
+
+    prepare_shards(using)
 
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        post_migrate.connect(prepare_shard, sender=self)
+        if settings.WRITE_BEHIND_ENABLED:
+            from . import writebehind
+
+            writebehind.start()
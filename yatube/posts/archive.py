@@ -0,0 +1,194 @@
+"""Cold storage for old posts.
+
+``manage.py archive_posts`` moves posts published more than
+POST_ARCHIVE_AFTER_DAYS days ago, with their comments, into the
+ArchivedPost and ArchivedComment tables of POST_ARCHIVE_DATABASE, so the
+hot tables and their indexes only hold recent posts. Archived rows keep
+their ids; post_detail and profile fall back to them transparently.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from core import pagecache
+from core.db import delete_rows
+
+from . import bulk, feed_cache, rollups, sharding, sitemaps
+from .models import ArchivedComment, ArchivedPost, Comment, Post, PostCard
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_MODELS = (ArchivedPost, ArchivedComment)
+
+POST_FIELDS = ('id', 'text', 'text_html', 'excerpt_html', 'render_version',
+               'pub_date', 'author_id', 'group_id', 'image')
+COMMENT_FIELDS = ('id', 'post_id', 'author_id', 'text', 'created')
+
+
+def posts():
+    return ArchivedPost.objects.all()
+
+
+def count_for_author(author_id):
+    return posts().filter(author_id=author_id).count()
+
+
+def copy(posts, comments):
+    """Write hot ``posts`` and their ``comments`` values to the archive."""
+    with transaction.atomic(using=settings.POST_ARCHIVE_DATABASE):
+        # ignore_conflicts makes a rerun after an interrupted move safe.
+        ArchivedPost.objects.bulk_create(
+            [
+                ArchivedPost(**{field: getattr(post, field)
+                                for field in POST_FIELDS})
+                for post in posts
+            ],
+            ignore_conflicts=True
+        )
+        ArchivedComment.objects.bulk_create(
+            [ArchivedComment(**comment) for comment in comments],
+            ignore_conflicts=True
+        )
+
+
+def move_batch(batch):
+    """Move the posts of ``batch`` that are unchanged since it was read.
+
+    The posts are read again, copied and deleted in one transaction of
+    their database, and only the comments that were copied are deleted,
+    so a comment or an edit made meanwhile is never lost. Returns the
+    moved posts.
+    """
+    alias = batch[0]._state.db
+    texts = {post.pk: post.text for post in batch}
+    with transaction.atomic(using=alias):
+        posts = [
+            post
+            for post in Post.objects.using(alias).select_for_update()
+            .filter(pk__in=list(texts)).only(*POST_FIELDS)
+            if texts[post.pk] == post.text
+        ]
+        if not posts:
+            return []
+        ids = [post.pk for post in posts]
+        comments = list(
+            Comment.objects.using(alias).filter(post_id__in=ids)
+            .values(*COMMENT_FIELDS)
+        )
+        copy(posts, comments)
+        delete_rows(Comment, alias, [comment['id'] for comment in comments])
+        delete_rows(Post, alias, ids)
+    return posts
+
+
+def move(queryset, chunk_size=None):
+    """Move the posts of ``queryset`` to the archive; returns their number."""
+    moved = 0
+    authors = set()
+    queryset = queryset.select_related(None).only(*POST_FIELDS)
+    chunk_size = chunk_size or settings.BULK_ACTION_CHUNK_SIZE
+    for batch in sharding.batches(queryset, chunk_size):
+        posts = move_batch(batch)
+        PostCard.objects.filter(pk__in=[post.pk for post in posts]).delete()
+        authors.update(post.author_id for post in posts)
+        moved += len(posts)
+        logger.info('Archived %d posts', moved)
+    for author_id in authors:
+        feed_cache.invalidate_followers(author_id)
+    if moved:
+        pagecache.invalidate()
+    return moved
+
+
+def archive_old_posts(days=None, chunk_size=None):
+    days = settings.POST_ARCHIVE_AFTER_DAYS if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    return move(Post.objects.filter(pub_date__lt=cutoff), chunk_size)
+
+
+def delete_author(author_id, chunk_size=None):
+    """Delete archived posts and comments of ``author_id`` in chunks."""
+    chunk_size = chunk_size or settings.BULK_ACTION_CHUNK_SIZE
+    alias = settings.POST_ARCHIVE_DATABASE
+    for field in ('author_id', 'post__author_id'):
+        comments = ArchivedComment.objects.filter(**{field: author_id})
+        while True:
+            ids = list(comments.values_list('pk', flat=True)[:chunk_size])
+            if not ids:
+                break
+            delete_rows(ArchivedComment, alias, ids)
+    posts = ArchivedPost.objects.filter(author_id=author_id).only(
+        *rollups.FIELDS, 'image'
+    )
+    while True:
+        batch = list(posts[:chunk_size])
+        if not batch:
+            break
+        ids = [post.pk for post in batch]
+        delete_rows(ArchivedPost, alias, ids)
+        rollups.removed(*batch)
+        sitemaps.changed(sitemaps.POSTS, ids)
+        for post in batch:
+            if post.image:
+                bulk.remove_image(post.image.name)
+
+
+class ChainedFeed:
+    """Paginator-compatible hot feed followed by the older archived one."""
+
+    ordered = True
+
+    def __init__(self, *feeds):
+        self.feeds = feeds
+
+    @cached_property
+    def counts(self):
+        return [feed.count() for feed in self.feeds]
+
+    def count(self):
+        return sum(self.counts)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start = key.start or 0
+        stop = self.count() if key.stop is None else key.stop
+        items, offset = [], 0
+        for feed, count in zip(self.feeds, self.counts):
+            lower = max(start - offset, 0)
+            upper = min(stop - offset, count)
+            if lower < upper:
+                items.extend(feed[lower:upper])
+            offset += count
+        return items
+
+
+class ArchiveRouter:
+    def db_for_read(self, model, **hints):
+        if model in ARCHIVE_MODELS:
+            return settings.POST_ARCHIVE_DATABASE
+        return None
+
+    db_for_write = db_for_read
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Archived rows point at users and groups of the default database.
+        if isinstance(obj1, ARCHIVE_MODELS) or isinstance(
+            obj2, ARCHIVE_MODELS
+        ):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if app_label == 'posts' and model_name in (
+            model._meta.model_name for model in ARCHIVE_MODELS
+        ):
+            return db == settings.POST_ARCHIVE_DATABASE
+        return None
@@ -0,0 +1,120 @@
+"""Set-based bulk changes of posts and comments.
+
+Rows are changed with one UPDATE or DELETE per chunk of
+BULK_ACTION_CHUNK_SIZE primary keys, each chunk in its own short
+transaction, instead of saving or collecting objects one by one. Model
+signals do not fire, so everything the signal receivers would have kept
+in sync (post cards, date rollups, sitemaps, RSS feeds, follow feeds,
+the page cache, image files) is updated here.
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from sorl.thumbnail import delete as delete_image
+
+from core import pagecache
+from core.db import delete_rows
+
+from . import cards, feed_cache, feeds, rollups, sharding, sitemaps
+from .models import Comment, Post, PostCard
+
+logger = logging.getLogger(__name__)
+
+
+def log_progress(action, done):
+    logger.info('%s: %d rows done', action, done)
+
+
+def chunks(queryset, fields, chunk_size):
+    queryset = queryset.select_related(None).only(*fields)
+    return sharding.batches(
+        queryset, chunk_size or settings.BULK_ACTION_CHUNK_SIZE
+    )
+
+
+def reassign_group(queryset, group, chunk_size=None, progress=log_progress):
+    """Move the posts of ``queryset`` to ``group`` (None removes it)."""
+    done = 0
+    fields = ['pk', 'pub_date', 'author_id', 'group_id']
+    for batch in chunks(queryset, fields, chunk_size):
+        alias = batch[0]._state.db
+        ids = [post.pk for post in batch]
+        with transaction.atomic(using=alias):
+            Post.objects.using(alias).filter(pk__in=ids).update(group=group)
+        rollups.regrouped(batch, group.pk if group else None)
+        feeds.changed(
+            {post.author_id for post in batch},
+            {post.group_id for post in batch} | {group.pk if group else None}
+        )
+        if cards.is_enabled():
+            PostCard.objects.filter(pk__in=ids).update(
+                group_id=group.pk if group else None,
+                group_slug=group.slug if group else '',
+                group_title=group.title if group else '',
+            )
+        done += len(ids)
+        progress('reassign_group', done)
+    pagecache.invalidate()
+    return done
+
+
+def delete_posts(queryset, chunk_size=None, progress=log_progress):
+    """Delete the posts of ``queryset`` with their comments and images."""
+    done = 0
+    authors = set()
+    fields = ['pk', 'pub_date', 'author_id', 'group_id', 'image']
+    for batch in chunks(queryset, fields, chunk_size):
+        alias = batch[0]._state.db
+        ids = [post.pk for post in batch]
+        with transaction.atomic(using=alias):
+            delete_rows(Comment, alias, ids, field='post_id')
+            delete_rows(Post, alias, ids)
+        PostCard.objects.filter(pk__in=ids).delete()
+        rollups.removed(*batch)
+        sitemaps.changed(sitemaps.POSTS, ids)
+        feeds.changed(
+            {post.author_id for post in batch},
+            {post.group_id for post in batch}
+        )
+        for post in batch:
+            if post.image:
+                remove_image(post.image.name)
+        authors.update(post.author_id for post in batch)
+        done += len(ids)
+        progress('delete_posts', done)
+    for author_id in authors:
+        feed_cache.invalidate_followers(author_id)
+    pagecache.invalidate()
+    return done
+
+
+def delete_comments(queryset, chunk_size=None, progress=log_progress):
+    done = 0
+    for batch in chunks(queryset, ['pk'], chunk_size):
+        alias = batch[0]._state.db
+        ids = [comment.pk for comment in batch]
+        with transaction.atomic(using=alias):
+            delete_rows(Comment, alias, ids)
+        done += len(ids)
+        progress('delete_comments', done)
+    pagecache.invalidate()
+    return done
+
+
+def purge_authors(author_ids, chunk_size=None, progress=log_progress):
+    """Delete every post and comment of ``author_ids``."""
+    author_ids = set(author_ids)
+    return (
+        delete_posts(Post.objects.filter(author_id__in=author_ids),
+                     chunk_size, progress),
+        delete_comments(Comment.objects.filter(author_id__in=author_ids),
+                        chunk_size, progress),
+    )
+
+
+def remove_image(name):
+    try:
+        delete_image(name)
+    except OSError:
+        logger.warning('Image %s was not deleted', name)
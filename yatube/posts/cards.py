@@ -0,0 +1,98 @@
+"""Denormalized post cards the feeds are rendered from.
+
+One PostCard row per post carries the author's and group's names, an
+excerpt and the thumbnail URL, so a feed page is a single query on one
+table. Rows are kept in sync by posts.signals while POST_CARDS_ENABLED is
+on; ``manage.py rebuild_post_cards`` refills the table after enabling it.
+"""
+import logging
+
+from django.conf import settings
+from sorl.thumbnail import get_thumbnail
+
+from . import sharding
+from .catalog import catalog
+from .models import Post, PostCard
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_GEOMETRY = '960x339'
+
+
+def is_enabled():
+    return settings.POST_CARDS_ENABLED
+
+
+def thumbnail_url(image):
+    if not image:
+        return ''
+    try:
+        return get_thumbnail(
+            image, THUMBNAIL_GEOMETRY, crop='center', upscale=True
+        ).url
+    except OSError:
+        logger.warning('No thumbnail for %s', image.name)
+        return ''
+
+
+def card_for(post):
+    group = catalog.by_id(post.group_id)
+    return PostCard(
+        id=post.pk,
+        pub_date=post.pub_date,
+        author_id=post.author_id,
+        author_username=post.author.username,
+        author_full_name=post.author.get_full_name(),
+        group_id=post.group_id,
+        group_slug=group.slug if group else '',
+        group_title=group.title if group else '',
+        excerpt_html=post.excerpt_html,
+        image=post.image.name,
+        thumbnail_url=thumbnail_url(post.image),
+    )
+
+
+def sync(post):
+    card_for(post).save()
+
+
+def remove(post_id):
+    PostCard.objects.filter(pk=post_id).delete()
+
+
+def sync_author(user):
+    PostCard.objects.filter(author_id=user.pk).update(
+        author_username=user.username,
+        author_full_name=user.get_full_name(),
+    )
+
+
+def sync_group(group):
+    PostCard.objects.filter(group_id=group.pk).update(
+        group_slug=group.slug, group_title=group.title
+    )
+
+
+def drop_group(group_id):
+    PostCard.objects.filter(group_id=group_id).update(
+        group_id=None, group_slug='', group_title=''
+    )
+
+
+def drop_author(author_id):
+    PostCard.objects.filter(author_id=author_id).delete()
+
+
+def feed(**filters):
+    return PostCard.objects.filter(**filters)
+
+
+def rebuild(batch_size=500):
+    """Refill the whole table from the posts; returns the number of cards."""
+    PostCard.objects.all().delete()
+    built = 0
+    posts = sharding.related(Post.objects.all(), 'author')
+    for batch in sharding.batches(posts, batch_size):
+        PostCard.objects.bulk_create([card_for(post) for post in batch])
+        built += len(batch)
+    return built
@@ -0,0 +1,79 @@
+"""Process-local catalog of groups.
+
+Groups are loaded once per process and looked up by slug or id without
+queries. Saving or deleting a group stores a new version under
+VERSION_KEY in the shared cache once the change is committed; every
+process compares it with the version its catalog was loaded at and
+reloads when they differ, or on every lookup while the cache cannot
+hold a version at all. The Group instances are shared between
+requests and must not be modified.
+"""
+import threading
+import uuid
+
+from django.core.cache import cache
+from django.http import Http404
+
+from core.versions import get_version
+
+from .models import Group
+
+VERSION_KEY = 'group_catalog.version'
+NOT_LOADED = object()
+
+
+def invalidate():
+    cache.set(VERSION_KEY, new_version(), None)
+
+
+def new_version():
+    return uuid.uuid4().hex
+
+
+def current_version():
+    return get_version(cache, VERSION_KEY, new_version)
+
+
+class GroupCatalog:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = NOT_LOADED
+        self._by_slug = {}
+        self._by_id = {}
+
+    def _is_current(self, version):
+        return version is not None and version == self._version
+
+    def _load(self):
+        version = current_version()
+        if self._is_current(version):
+            return
+        with self._lock:
+            if self._is_current(version):
+                return
+            groups = list(Group.objects.order_by('title', 'pk'))
+            self._by_slug = {group.slug: group for group in groups}
+            self._by_id = {group.pk: group for group in groups}
+            self._version = version
+
+    def all(self):
+        self._load()
+        return list(self._by_id.values())
+
+    def by_slug(self, slug):
+        self._load()
+        return self._by_slug.get(slug)
+
+    def by_id(self, group_id):
+        self._load()
+        return self._by_id.get(group_id)
+
+
+catalog = GroupCatalog()
+
+
+def get_or_404(slug):
+    group = catalog.by_slug(slug)
+    if group is None:
+        raise Http404('No Group matches the given query.')
+    return group
@@ -0,0 +1,11 @@
+from django.utils.functional import SimpleLazyObject
+
+from . import following as following_cache
+
+
+def following(request):
+    return {
+        'followed_ids': SimpleLazyObject(
+            lambda: following_cache.for_request(request)
+        )
+    }
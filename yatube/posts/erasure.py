@@ -0,0 +1,93 @@
+"""Background deletion of users with large histories.
+
+schedule() only deactivates the user and records a UserDeletion job, so
+the request returns at once and the user can no longer log in. A worker
+thread then removes the posts (with their comments and images), the
+comments, the archived posts and comments and the follows of the user
+in chunks of BULK_ACTION_CHUNK_SIZE rows, and deletes the by then
+small user row last. ``manage.py process_user_deletions`` finishes
+jobs interrupted by a restart.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.db import delete_rows
+
+from . import archive, bulk, feed_cache, following
+from .models import Comment, Follow, Post, User, UserDeletion
+
+logger = logging.getLogger(__name__)
+
+executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='erasure')
+
+
+def schedule(user):
+    with transaction.atomic():
+        user.is_active = False
+        user.set_unusable_password()
+        user.save(update_fields=['is_active', 'password'])
+        job, _ = UserDeletion.objects.get_or_create(
+            user_id=user.pk, defaults={'username': user.username}
+        )
+        transaction.on_commit(lambda: executor.submit(run_in_background,
+                                                      job.pk))
+    return job
+
+
+def delete_follows(user_id, chunk_size):
+    """Delete follows from and to ``user_id``; returns the followers."""
+    alias = router.db_for_write(Follow)
+    follows = Follow.objects.using(alias).filter(
+        Q(user_id=user_id) | Q(author_id=user_id)
+    ).order_by('pk')
+    users = set()
+    while True:
+        batch = list(follows.values_list('pk', 'user_id')[:chunk_size])
+        if not batch:
+            break
+        delete_rows(Follow, alias, [pk for pk, _ in batch])
+        users.update(follower_id for _, follower_id in batch)
+    users.discard(user_id)
+    for follower_id in users:
+        following.invalidate(follower_id)
+        feed_cache.invalidate(follower_id)
+    return users
+
+
+def delete_content(user_id, chunk_size=None):
+    """Delete the posts, comments and archived posts of ``user_id``."""
+    bulk.delete_posts(Post.objects.filter(author_id=user_id), chunk_size)
+    bulk.delete_comments(Comment.objects.filter(author_id=user_id), chunk_size)
+    archive.delete_author(user_id, chunk_size)
+
+
+def run(job):
+    chunk_size = settings.BULK_ACTION_CHUNK_SIZE
+    delete_content(job.user_id, chunk_size)
+    delete_follows(job.user_id, chunk_size)
+    User.objects.filter(pk=job.user_id).delete()
+    job.finished = timezone.now()
+    job.save(update_fields=['finished'])
+    logger.info('User %s deleted', job.username)
+
+
+def run_in_background(job_id):
+    try:
+        run(UserDeletion.objects.get(pk=job_id))
+    except Exception:
+        logger.exception('Deletion of user job %s failed', job_id)
+    finally:
+        close_old_connections()
+
+
+def resume():
+    """Run every unfinished job in the current thread."""
+    jobs = list(UserDeletion.objects.filter(finished__isnull=True))
+    for job in jobs:
+        run(job)
+    return len(jobs)
@@ -0,0 +1,85 @@
+"""Cached post ids of the first pages of every user's follow feed."""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import cached_property
+
+from . import cards, following, sharding
+from .models import Follow, Post, PostCard
+
+
+def feed_key(user_id):
+    return f'follow_feed.{user_id}'
+
+
+def invalidate(*user_ids):
+    cache.delete_many([feed_key(user_id) for user_id in user_ids])
+
+
+def invalidate_followers(author_id):
+    invalidate(*Follow.objects.filter(author_id=author_id)
+               .values_list('user_id', flat=True))
+
+
+class FollowFeed:
+    """Paginator-compatible follow feed of ``user``.
+
+    Pages within FOLLOW_FEED_CACHED_PAGES are hydrated from the cached ids
+    with a single in_bulk() query; deeper pages hit the database.
+    """
+
+    ordered = True
+
+    def __init__(self, user):
+        self.user = user
+        entry = cache.get(feed_key(user.pk))
+        if entry is None:
+            entry = self.fill()
+        self.ids, self.total = entry
+
+    @cached_property
+    def queryset(self):
+        authors = following.followed_ids(self.user)
+        if cards.is_enabled():
+            return cards.feed(author_id__in=authors)
+        return Post.objects.filter(author__in=authors)
+
+    def scatter(self, queryset, *fields):
+        if cards.is_enabled():
+            return queryset
+        return sharding.scatter(queryset, *fields)
+
+    def filter(self, *conditions):
+        """Uncached feed of the posts matching ``conditions``."""
+        return self.scatter(self.queryset.filter(*conditions), 'author')
+
+    def fill(self):
+        limit = settings.FOLLOW_FEED_CACHED_PAGES * settings.MAX_PAGE_AMOUNT
+        latest = self.scatter(self.queryset.only('pk', 'pub_date'))
+        entry = (
+            [post.pk for post in latest[:limit]],
+            self.scatter(self.queryset).count()
+        )
+        cache.set(
+            feed_key(self.user.pk), entry, settings.FOLLOW_FEED_CACHE_TIMEOUT
+        )
+        return entry
+
+    def count(self):
+        return self.total
+
+    def __len__(self):
+        return self.total
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        stop = self.total if key.stop is None else key.stop
+        if stop > len(self.ids) and self.total > len(self.ids):
+            feed = self.scatter(self.queryset, 'author')
+            return list(feed[key])
+        ids = self.ids[key]
+        if cards.is_enabled():
+            posts = PostCard.objects.in_bulk(ids)
+        else:
+            posts = sharding.in_bulk(ids, 'author')
+        return [posts[post_id] for post_id in ids if post_id in posts]
@@ -0,0 +1,226 @@
+"""RSS and Atom feeds of the whole site, of every group and every author.
+
+Items come from the same feed builders as the index, group and profile
+pages. Every feed has a version in the cache that post, group and user
+changes replace; the rendered response is cached under it and the
+version gives the ETag and Last-Modified of conditional GETs, so a
+reader polling an unchanged feed costs cache lookups only.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.html import strip_tags
+from django.utils.http import http_date
+from django.utils.text import Truncator
+
+from core.versions import get_version
+
+from . import catalog
+from .models import PostCard, User
+from .sitemaps import canonical_url
+from .views import group_feed, index_feed, profile_feed
+
+ALL = 'all'
+GROUP = 'group'
+AUTHOR = 'author'
+
+
+def version_key(scope, scope_id=0):
+    return f'feeds.version.{scope}.{scope_id}'
+
+
+def changed(author_ids=(), group_ids=()):
+    """Replace the versions of the global, author and group feeds."""
+    keys = [version_key(ALL)]
+    keys += [version_key(AUTHOR, author_id) for author_id in author_ids]
+    keys += [
+        version_key(GROUP, group_id)
+        for group_id in group_ids if group_id is not None
+    ]
+    now = time.time_ns()
+    cache.set_many({key: now for key in keys}, None)
+
+
+def version(key):
+    return get_version(cache, key, time.time_ns)
+
+
+def author_id_key(username):
+    return f'feeds.author_id.{username}'
+
+
+def author_id(username):
+    key = author_id_key(username)
+    pk = cache.get(key)
+    if pk is None:
+        pk = get_object_or_404(User, username=username).pk
+        cache.set(key, pk, settings.FEED_CACHE_TIMEOUT)
+    return pk
+
+
+def forget_authors(usernames):
+    """Drop the cached ids of ``usernames`` after a rename or deletion."""
+    cache.delete_many([
+        author_id_key(username) for username in usernames if username
+    ])
+
+
+def serve(request, feed, key, *args):
+    """The cached ``feed`` response, or 304 when the reader has it."""
+    current = version(key)
+    digest = hashlib.md5(f'{request.path}:{current}'.encode()).hexdigest()
+    etag = f'"{digest}"'
+    last_modified = current // 10 ** 9
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is not None:
+        return response
+    response = cache.get(f'feeds.response.{digest}')
+    if response is None:
+        response = feed(request, *args)
+        cache.set(
+            f'feeds.response.{digest}', response, settings.FEED_CACHE_TIMEOUT
+        )
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+class PostFeed(Feed):
+    # Links are absolute on SITE_URL: the rendered feed is cached for
+    # every host, and Feed leaves absolute links as they are.
+    kind = 'rss'
+
+    def items(self, obj):
+        return self.post_list(obj)[:settings.FEED_ITEMS]
+
+    def item_title(self, item):
+        text = strip_tags(item.excerpt_html) or getattr(item, 'text', '')
+        return Truncator(text).chars(60)
+
+    def item_description(self, item):
+        if isinstance(item, PostCard):
+            return item.excerpt_html
+        return item.text_html or item.excerpt_html or item.text
+
+    def item_link(self, item):
+        return canonical_url(reverse('posts:post_detail', args=[item.pk]))
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_author_name(self, item):
+        if isinstance(item, PostCard):
+            return item.author_full_name or item.author_username
+        return item.author.get_full_name() or item.author.username
+
+
+class LatestPostsFeed(PostFeed):
+    title = 'Последние обновления на сайте'
+    description = 'Новые записи всех авторов Yatube'
+
+    def link(self, obj):
+        return canonical_url(reverse('posts:index'))
+
+    def feed_url(self, obj):
+        return canonical_url(reverse(f'posts:{self.kind}'))
+
+    def post_list(self, obj):
+        return index_feed()
+
+
+class GroupPostsFeed(PostFeed):
+    def get_object(self, request, slug):
+        return catalog.get_or_404(slug)
+
+    def title(self, group):
+        return group.title
+
+    def link(self, group):
+        return canonical_url(reverse('posts:group_list', args=[group.slug]))
+
+    def feed_url(self, group):
+        return canonical_url(
+            reverse(f'posts:group_{self.kind}', args=[group.slug])
+        )
+
+    def description(self, group):
+        return group.description
+
+    def post_list(self, group):
+        return group_feed(group)
+
+
+class AuthorPostsFeed(PostFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, author):
+        return f'Записи пользователя {author.get_full_name() or author}'
+
+    def link(self, author):
+        return canonical_url(reverse('posts:profile', args=[author.username]))
+
+    def feed_url(self, author):
+        return canonical_url(
+            reverse(f'posts:profile_{self.kind}', args=[author.username])
+        )
+
+    def description(self, author):
+        return self.title(author)
+
+    def post_list(self, author):
+        return profile_feed(author)
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    kind = 'atom'
+    subtitle = LatestPostsFeed.description
+
+
+class GroupPostsAtomFeed(GroupPostsFeed):
+    feed_type = Atom1Feed
+    kind = 'atom'
+
+    def subtitle(self, group):
+        return self.description(group)
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+    kind = 'atom'
+
+    def subtitle(self, author):
+        return self.description(author)
+
+
+FEEDS = {
+    'rss': (LatestPostsFeed(), GroupPostsFeed(), AuthorPostsFeed()),
+    'atom': (LatestPostsAtomFeed(), GroupPostsAtomFeed(),
+             AuthorPostsAtomFeed()),
+}
+
+
+def latest_posts(request, kind):
+    return serve(request, FEEDS[kind][0], version_key(ALL))
+
+
+def group_posts(request, slug, kind):
+    group = catalog.get_or_404(slug)
+    return serve(request, FEEDS[kind][1], version_key(GROUP, group.pk), slug)
+
+
+def author_posts(request, username, kind):
+    return serve(
+        request, FEEDS[kind][2], version_key(AUTHOR, author_id(username)),
+        username
+    )
@@ -0,0 +1,56 @@
+"""Follow graph: cached followed author ids and set-based (un)follows."""
+from django.conf import settings
+from django.core.cache import cache
+from django.dispatch import Signal
+
+from .models import Follow
+
+# Sent by follow() and unfollow(), which bypass per-object model signals.
+follows_changed = Signal(providing_args=['user_id'])
+
+
+def following_key(user_id):
+    return f'following.{user_id}'
+
+
+def invalidate(user_id):
+    cache.delete(following_key(user_id))
+
+
+def followed_ids(user):
+    if not user.is_authenticated:
+        return frozenset()
+    key = following_key(user.pk)
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(
+            Follow.objects.filter(user=user)
+            .values_list('author_id', flat=True)
+        )
+        cache.set(key, ids, settings.FOLLOWING_CACHE_TIMEOUT)
+    return ids
+
+
+def for_request(request):
+    """followed_ids() of the current user, loaded once per request."""
+    if not hasattr(request, '_followed_ids'):
+        request._followed_ids = followed_ids(request.user)
+    return request._followed_ids
+
+
+def follow(user, author_ids):
+    """Follow ``author_ids`` with a single INSERT OR IGNORE."""
+    Follow.objects.bulk_create(
+        [
+            Follow(user=user, author_id=author_id)
+            for author_id in set(author_ids) if author_id != user.pk
+        ],
+        ignore_conflicts=True
+    )
+    follows_changed.send(sender=Follow, user_id=user.pk)
+
+
+def unfollow(user, author_ids):
+    """Unfollow ``author_ids``; the rows are read once for post_delete."""
+    Follow.objects.filter(user=user, author_id__in=set(author_ids)).delete()
+    follows_changed.send(sender=Follow, user_id=user.pk)
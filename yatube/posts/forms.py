@@ -1,6 +1,21 @@
 from django import forms
+from django.forms.models import ModelChoiceIterator
 
-from .models import Comment, Post
+from .catalog import catalog
+from .models import Comment, Group, Post
+
+
+class CatalogChoiceIterator(ModelChoiceIterator):
+    """Group choices from the in-process catalog instead of a query."""
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for group in catalog.all():
+            yield self.choice(group)
+
+    def __len__(self):
+        return len(catalog.all()) + (self.field.empty_label is not None)
 
 
 class PostForm(forms.ModelForm):
@@ -13,6 +28,12 @@ class PostForm(forms.ModelForm):
             'image': 'картинка поста'
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        group = self.fields['group']
+        group.iterator = CatalogChoiceIterator
+        group.widget.choices = group.choices
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
@@ -24,3 +45,18 @@ class CommentForm(forms.ModelForm):
         help_texts = {
             'text': 'Текст нового комментария',
         }
+
+
+class ReassignGroupForm(forms.Form):
+    group = forms.ModelChoiceField(
+        Group.objects.all(),
+        required=False,
+        label='Группа',
+        empty_label='-без группы-',
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        group = self.fields['group']
+        group.iterator = CatalogChoiceIterator
+        group.widget.choices = group.choices
@@ -0,0 +1,111 @@
+import os
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Times the post changelist of the admin on a throwaway SQLite '
+            'file filled with the given number of posts.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--batch-size', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        database = connections.databases['default']
+        original = dict(database)
+        try:
+            with tempfile.TemporaryDirectory() as directory, \
+                    override_settings(DEBUG=False, POST_SHARDS=[],
+                                      DATABASE_REPLICAS=[]):
+                connections['default'].close()
+                database.update(
+                    NAME=os.path.join(directory, 'benchmark.sqlite3')
+                )
+                call_command('migrate', verbosity=0)
+                started = time.monotonic()
+                self.seed(options['posts'], options['batch_size'])
+                self.stdout.write(
+                    f'{options["posts"]} posts created in '
+                    f'{time.monotonic() - started:.1f}s'
+                )
+                self.measure(options['repeat'])
+                connections['default'].close()
+        finally:
+            connections['default'].close()
+            database.clear()
+            database.update(original)
+
+    def seed(self, total, batch_size):
+        authors = [
+            User.objects.create_user(username=f'author{number}')
+            for number in range(100)
+        ]
+        groups = [
+            Group.objects.create(
+                title=f'Группа {number}', slug=f'group-{number}',
+                description=''
+            )
+            for number in range(50)
+        ]
+        created = 0
+        while created < total:
+            size = min(batch_size, total - created)
+            Post.objects.bulk_create([
+                Post(
+                    text=f'Пост {created + number}',
+                    author=authors[(created + number) % len(authors)],
+                    group=groups[(created + number) % len(groups)],
+                )
+                for number in range(size)
+            ])
+            created += size
+
+    def measure(self, repeat):
+        admin = User.objects.create_superuser('admin', 'admin@example.com',
+                                              'admin')
+        client = Client()
+        client.force_login(admin)
+        changelist = reverse('admin:posts_post_changelist')
+        middle = Post.objects.order_by('-pk').values_list('pk', flat=True)[
+            Post.objects.count() // 2
+        ]
+        week_ago = timezone.now() - timedelta(days=7)
+        pages = (
+            ('first page', {}),
+            ('page 50', {'p': 49}),
+            ('past 7 days', {'pub_date__gte': week_ago.isoformat()}),
+            ('keyset middle', {'before': middle}),
+            ('search', {'q': 'Пост 4242'}),
+        )
+        for label, params in pages:
+            timings, sql_timings = [], []
+            for _ in range(repeat):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.monotonic()
+                    response = client.get(changelist, params)
+                    timings.append(time.monotonic() - started)
+                sql_timings.append(sum(
+                    float(query['time']) for query in queries.captured_queries
+                ))
+            self.stdout.write(
+                f'{label}: {statistics.median(timings) * 1000:.0f} ms, '
+                f'SQL {statistics.median(sql_timings) * 1000:.0f} ms in '
+                f'{len(queries)} queries, status {response.status_code}'
+            )
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.archive import archive_old_posts
+
+
+class Command(BaseCommand):
+    help = ('Moves old posts with their comments from the hot tables to '
+            'the archive.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.POST_ARCHIVE_AFTER_DAYS,
+            help='Archive posts published more than this many days ago.'
+        )
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        moved = archive_old_posts(options['days'], options['batch_size'])
+        self.stdout.write(f'Posts archived: {moved}')
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.sharding import dangling_references
+
+
+class Command(BaseCommand):
+    help = ('Reports posts and comments whose author or group is missing. '
+            'These foreign keys have no database constraint.')
+
+    def handle(self, *args, **options):
+        broken = 0
+        for model, field, missing in dangling_references():
+            if missing:
+                broken += 1
+                self.stdout.write(
+                    f'{model._meta.label}.{field}: missing '
+                    f'{", ".join(map(str, missing))}'
+                )
+        if broken:
+            raise CommandError('Dangling post references found.')
+        self.stdout.write('Post references are consistent.')
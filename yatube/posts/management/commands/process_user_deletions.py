@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from posts.erasure import resume
+
+
+class Command(BaseCommand):
+    help = 'Finishes scheduled user deletions, e.g. after a restart.'
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'User deletions finished: {resume()}')
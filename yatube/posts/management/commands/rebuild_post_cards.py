@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.cards import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the flattened post cards the feeds are rendered from.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        built = rebuild(batch_size=options['batch_size'])
+        self.stdout.write(f'Post cards built: {built}')
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from posts.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = ('Recounts the daily and monthly post rollups of the date '
+            'archive from the hot and archived posts.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        count = rebuild(options['batch_size'])
+        self.stdout.write(f'Rollups rebuilt: {count}')
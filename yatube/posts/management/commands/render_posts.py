@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from posts.rendering import backfill
+
+
+class Command(BaseCommand):
+    help = ('Stores rendered HTML for posts saved before the current '
+            'rendering version.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        rendered = backfill(batch_size=options['batch_size'])
+        self.stdout.write(f'Posts rendered: {rendered}')
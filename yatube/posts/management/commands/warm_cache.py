@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.warmup import warm
+
+
+class Command(BaseCommand):
+    help = ('Compiles templates, primes thumbnails and renders the first '
+            'pages of the index, popular groups and popular profiles.')
+
+    def add_arguments(self, parser):
+        defaults = settings.CACHE_WARMUP
+        parser.add_argument('--pages', type=int, default=defaults['pages'])
+        parser.add_argument('--groups', type=int, default=defaults['groups'])
+        parser.add_argument(
+            '--profiles', type=int, default=defaults['profiles']
+        )
+        parser.add_argument(
+            '--thumbnails', type=int, default=defaults['thumbnails']
+        )
+        parser.add_argument(
+            '--workers', type=int, default=defaults['workers'],
+            help='Pages rendered concurrently.'
+        )
+
+    def handle(self, *args, **options):
+        result = warm(
+            pages=options['pages'],
+            groups=options['groups'],
+            profiles=options['profiles'],
+            thumbnails=options['thumbnails'],
+            workers=options['workers'],
+        )
+        self.stdout.write(
+            f'Templates compiled: {result["templates"]}, '
+            f'thumbnails: {result["thumbnails"]}, '
+            f'pages rendered: {result["pages"]}, failed: {result["failed"]}'
+        )
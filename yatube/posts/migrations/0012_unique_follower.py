@@ -0,0 +1,32 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:14
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicate_follows(apps, schema_editor):
+    Follow = apps.get_model('posts', 'Follow')
+    follows = Follow.objects.using(schema_editor.connection.alias)
+    first_ids = (
+        follows.values('user', 'author')
+        .annotate(first_id=Min('id'))
+        .values('first_id')
+    )
+    follows.exclude(id__in=first_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_shardable_foreign_keys'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_follows, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.UniqueConstraint(fields=('user', 'author'), name='unique_follower'),
+        ),
+    ]
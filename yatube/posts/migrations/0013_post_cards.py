@@ -0,0 +1,32 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_unique_follower'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostCard',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('pub_date', models.DateTimeField(db_index=True)),
+                ('author_id', models.IntegerField(db_index=True)),
+                ('author_username', models.CharField(max_length=150)),
+                ('author_full_name', models.CharField(blank=True, max_length=300)),
+                ('group_id', models.IntegerField(db_index=True, null=True)),
+                ('group_slug', models.CharField(blank=True, max_length=50)),
+                ('group_title', models.CharField(blank=True, max_length=200)),
+                ('excerpt', models.TextField()),
+                ('image', models.ImageField(blank=True, upload_to='posts/')),
+                ('thumbnail_url', models.CharField(blank=True, max_length=500)),
+            ],
+            options={
+                'ordering': ('-pub_date',),
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_post_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('all', 'Все посты'), ('group', 'Группа'), ('author', 'Автор')], max_length=6)),
+                ('scope_id', models.IntegerField(default=0)),
+                ('period', models.CharField(choices=[('day', 'День'), ('month', 'Месяц')], max_length=5)),
+                ('start', models.DateField()),
+                ('posts', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ('-start',),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='postrollup',
+            constraint=models.UniqueConstraint(fields=('scope', 'scope_id', 'period', 'start'), name='unique_rollup'),
+        ),
+    ]
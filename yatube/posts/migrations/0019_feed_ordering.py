@@ -0,0 +1,25 @@
+# Generated by Django 2.2.16 on 2026-10-19 11:02
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_post_rollups'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='archivedpost',
+            options={'ordering': ('-pub_date', '-pk'), 'verbose_name': 'Архивный пост', 'verbose_name_plural': 'Архивные посты'},
+        ),
+        migrations.AlterModelOptions(
+            name='post',
+            options={'ordering': ('-pub_date', '-pk'), 'verbose_name': 'Пост', 'verbose_name_plural': 'Посты'},
+        ),
+        migrations.AlterModelOptions(
+            name='postcard',
+            options={'ordering': ('-pub_date', '-pk')},
+        ),
+    ]
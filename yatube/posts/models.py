@@ -5,6 +5,15 @@ from django.db.models.constraints import UniqueConstraint
 User = get_user_model()
 
 
+class RoutedManager(models.Manager):
+    def create(self, **kwargs):
+        # Unlike QuerySet.create() this lets database routers see the new
+        # instance, which is what decides the shard of a post or comment.
+        obj = self.model(**kwargs)
+        obj.save(force_insert=True, using=self._db)
+        return obj
+
+
 class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
@@ -19,12 +28,15 @@ class Post(models.Model):
         'Текст поста',
         help_text='Введите текст поста'
     )
-    pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
+    pub_date = models.DateTimeField(
+        'Дата публикации', auto_now_add=True, db_index=True
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
         verbose_name='Автор',
-        related_name='posts'
+        related_name='posts',
+        db_constraint=False
     )
     group = models.ForeignKey(
         Group,
@@ -33,31 +45,55 @@ class Post(models.Model):
         on_delete=models.SET_NULL,
         related_name='posts',
         verbose_name='Группа',
-        help_text='Выберите группу'
+        help_text='Выберите группу',
+        db_constraint=False
     )
     image = models.ImageField(
         'Картинка',
         upload_to='posts/',
         blank=True
     )
+    text_html = models.TextField(editable=False, blank=True)
+    excerpt_html = models.TextField(editable=False, blank=True)
+    render_version = models.PositiveSmallIntegerField(
+        default=0, editable=False
+    )
+
+    objects = RoutedManager()
 
     class Meta:
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-pk')
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The stored group, which the post_save receivers compare with the
+        # saved one; unknown while group_id is deferred.
+        if 'group_id' in self.__dict__:
+            self._saved_group_id = self.group_id
+
     def __str__(self):
         return self.text[:15]
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._saved_group_id = self.group_id
+
+    def saved_group_id(self):
+        return getattr(self, '_saved_group_id', self.group_id)
+
 
 class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE,
                              related_name='comments')
     author = models.ForeignKey(User, on_delete=models.CASCADE,
-                               related_name='comments')
+                               related_name='comments', db_constraint=False)
     text = models.TextField()
     created = models.DateTimeField("Дата публикации", auto_now_add=True)
 
+    objects = RoutedManager()
+
     class Meta:
         ordering = ('-created',)
 
@@ -78,4 +114,129 @@ class Follow(models.Model):
     )
 
     class Meta:
-        UniqueConstraint(fields=['user', 'author'], name='unique_follower')
+        constraints = [
+            UniqueConstraint(fields=['user', 'author'], name='unique_follower')
+        ]
+
+
+class PostCard(models.Model):
+    """Flattened copy of a post with everything a feed card shows."""
+
+    id = models.BigIntegerField(primary_key=True)
+    pub_date = models.DateTimeField(db_index=True)
+    author_id = models.IntegerField(db_index=True)
+    author_username = models.CharField(max_length=150)
+    author_full_name = models.CharField(max_length=300, blank=True)
+    group_id = models.IntegerField(null=True, db_index=True)
+    group_slug = models.CharField(max_length=50, blank=True)
+    group_title = models.CharField(max_length=200, blank=True)
+    excerpt_html = models.TextField()
+    image = models.ImageField(upload_to='posts/', blank=True)
+    thumbnail_url = models.CharField(max_length=500, blank=True)
+
+    class Meta:
+        ordering = ('-pub_date', '-pk')
+
+    def __str__(self):
+        return f'{self.author_username} #{self.pk}'
+
+
+class UserDeletion(models.Model):
+    user_id = models.IntegerField('Пользователь', unique=True)
+    username = models.CharField('Имя пользователя', max_length=150)
+    requested = models.DateTimeField('Запрошено', auto_now_add=True)
+    finished = models.DateTimeField('Завершено', null=True, blank=True)
+
+    class Meta:
+        ordering = ('-requested',)
+        verbose_name = 'Удаление пользователя'
+        verbose_name_plural = 'Удаления пользователей'
+
+    def __str__(self):
+        return self.username
+
+
+class ArchivedPost(models.Model):
+    """Post moved out of the hot tables by posts.archive."""
+
+    id = models.BigIntegerField(primary_key=True)
+    text = models.TextField('Текст поста')
+    text_html = models.TextField(blank=True)
+    excerpt_html = models.TextField(blank=True)
+    render_version = models.PositiveSmallIntegerField(default=0)
+    pub_date = models.DateTimeField('Дата публикации', db_index=True)
+    author = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        verbose_name='Автор',
+        related_name='+',
+        db_constraint=False
+    )
+    group = models.ForeignKey(
+        Group,
+        blank=True,
+        null=True,
+        on_delete=models.DO_NOTHING,
+        related_name='+',
+        verbose_name='Группа',
+        db_constraint=False
+    )
+    image = models.ImageField('Картинка', upload_to='posts/', blank=True)
+    archived = models.DateTimeField('Перенесён в архив', auto_now_add=True)
+
+    class Meta:
+        ordering = ('-pub_date', '-pk')
+        verbose_name = 'Архивный пост'
+        verbose_name_plural = 'Архивные посты'
+
+    def __str__(self):
+        return self.text[:15]
+
+
+class ArchivedComment(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    post = models.ForeignKey(ArchivedPost, on_delete=models.CASCADE,
+                             related_name='comments')
+    author = models.ForeignKey(User, on_delete=models.DO_NOTHING,
+                               related_name='+', db_constraint=False)
+    text = models.TextField()
+    created = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        ordering = ('-created',)
+
+    def __str__(self):
+        return self.text[:15]
+
+
+class PostRollup(models.Model):
+    """Number of posts of a day or a month, overall, per group or author."""
+
+    ALL = 'all'
+    GROUP = 'group'
+    AUTHOR = 'author'
+    DAY = 'day'
+    MONTH = 'month'
+
+    scope = models.CharField(
+        max_length=6,
+        choices=((ALL, 'Все посты'), (GROUP, 'Группа'), (AUTHOR, 'Автор'))
+    )
+    scope_id = models.IntegerField(default=0)
+    period = models.CharField(
+        max_length=5, choices=((DAY, 'День'), (MONTH, 'Месяц'))
+    )
+    start = models.DateField()
+    posts = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ('-start',)
+        constraints = [
+            UniqueConstraint(
+                fields=['scope', 'scope_id', 'period', 'start'],
+                name='unique_rollup'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.scope} {self.scope_id} {self.start}: {self.posts}'
@@ -0,0 +1,52 @@
+"""New-post high-water marks that feed pages poll without the database.
+
+Every created post bumps the marks of the whole site, of its group and of
+its author in the cache. The cursor of a feed is the sum of the marks it
+is made of, so "N new posts since cursor X" is the difference between
+the current sum and X and costs a single cache.get_many().
+
+The marks live in the shared cache itself: its incr() is atomic, while
+the one of the two-tier default cache is a get and a set, and its
+in-process copies would lag behind for L1_TIMEOUT.
+"""
+from django.core.cache import caches
+
+ALL = 'all'
+GROUP = 'group'
+AUTHOR = 'author'
+CACHE = 'shared'
+
+
+def mark_key(scope, scope_id=0):
+    return f'new_posts.{scope}.{scope_id}'
+
+
+def bump(post):
+    keys = [mark_key(ALL), mark_key(AUTHOR, post.author_id)]
+    if post.group_id is not None:
+        keys.append(mark_key(GROUP, post.group_id))
+    cache = caches[CACHE]
+    for key in keys:
+        cache.add(key, 0, None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Evicted between add() and incr(); cursors of the old value
+            # simply report no new posts.
+            cache.set(key, 1, None)
+
+
+def index_keys():
+    return [mark_key(ALL)]
+
+
+def group_keys(group):
+    return [mark_key(GROUP, group.pk)]
+
+
+def follow_keys(author_ids):
+    return [mark_key(AUTHOR, author_id) for author_id in author_ids]
+
+
+def high_water(keys):
+    return sum(caches[CACHE].get_many(keys).values())
@@ -0,0 +1,62 @@
+"""HTML of post bodies rendered once, when the post is saved.
+
+Bump VERSION whenever the output below changes and run
+``manage.py render_posts`` to re-render the stored HTML.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils.html import format_html, linebreaks
+from django.utils.text import Truncator
+
+from core import pagecache
+
+from . import cards, sharding
+from .models import ArchivedPost, Post, PostCard
+
+VERSION = 1
+
+
+def body(text):
+    return linebreaks(text, autoescape=True)
+
+
+def excerpt(text):
+    return format_html(
+        '<p>{}</p>', Truncator(text).chars(settings.POST_EXCERPT_LENGTH)
+    )
+
+
+def render(post):
+    post.text_html = body(post.text)
+    post.excerpt_html = excerpt(post.text)
+    post.render_version = VERSION
+
+
+def backfill(batch_size=500):
+    """Render hot and archived posts stored with an older VERSION.
+
+    Returns the number of posts rendered.
+    """
+    rendered = 0
+    for model in (Post, ArchivedPost):
+        stale = model.objects.filter(render_version__lt=VERSION).only(
+            'pk', 'text'
+        )
+        for batch in sharding.batches(stale, batch_size):
+            alias = batch[0]._state.db
+            with transaction.atomic(using=alias):
+                for post in batch:
+                    render(post)
+                    model.objects.using(alias).filter(pk=post.pk).update(
+                        text_html=post.text_html,
+                        excerpt_html=post.excerpt_html,
+                        render_version=post.render_version,
+                    )
+            if model is Post and cards.is_enabled():
+                for post in batch:
+                    PostCard.objects.filter(pk=post.pk).update(
+                        excerpt_html=post.excerpt_html
+                    )
+            rendered += len(batch)
+    pagecache.invalidate()
+    return rendered
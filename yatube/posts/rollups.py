@@ -0,0 +1,131 @@
+"""Post counts per day and month, overall, per group and per author.
+
+The counters are changed by the Post signal receivers and by the
+set-based paths in posts.bulk and posts.erasure, so the date archive
+pages never count posts with GROUP BY. ``manage.py rebuild_rollups``
+recomputes them from the hot and archived posts.
+"""
+import calendar
+from collections import Counter
+from datetime import date
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import sharding
+from .models import ArchivedPost, Post, PostRollup
+
+FIELDS = ('pk', 'pub_date', 'author_id', 'group_id')
+
+
+def scopes(author_id, group_id):
+    yield PostRollup.ALL, 0
+    yield PostRollup.AUTHOR, author_id
+    if group_id is not None:
+        yield PostRollup.GROUP, group_id
+
+
+def keys(pub_date, author_id, group_id):
+    day = timezone.localtime(pub_date).date()
+    for scope, scope_id in scopes(author_id, group_id):
+        yield scope, scope_id, PostRollup.DAY, day
+        yield scope, scope_id, PostRollup.MONTH, day.replace(day=1)
+
+
+def count(posts, delta):
+    changes = Counter()
+    for post in posts:
+        for key in keys(post.pub_date, post.author_id, post.group_id):
+            changes[key] += delta
+    return changes
+
+
+def apply(changes):
+    changes = {key: delta for key, delta in changes.items() if delta}
+    if not changes:
+        return
+    with transaction.atomic():
+        PostRollup.objects.bulk_create(
+            [
+                PostRollup(scope=scope, scope_id=scope_id, period=period,
+                           start=start)
+                for scope, scope_id, period, start in changes
+            ],
+            ignore_conflicts=True
+        )
+        for (scope, scope_id, period, start), delta in changes.items():
+            PostRollup.objects.filter(
+                scope=scope, scope_id=scope_id, period=period, start=start
+            ).update(posts=F('posts') + delta)
+
+
+def added(*posts):
+    apply(count(posts, 1))
+
+
+def removed(*posts):
+    apply(count(posts, -1))
+
+
+def group_changes(pub_date, old_group_id, group_id):
+    changes = Counter()
+    day = timezone.localtime(pub_date).date()
+    for period, start in ((PostRollup.DAY, day),
+                          (PostRollup.MONTH, day.replace(day=1))):
+        if old_group_id is not None:
+            changes[PostRollup.GROUP, old_group_id, period, start] -= 1
+        if group_id is not None:
+            changes[PostRollup.GROUP, group_id, period, start] += 1
+    return changes
+
+
+def regrouped(posts, group_id):
+    """Move the group counters of ``posts`` to ``group_id``."""
+    changes = Counter()
+    for post in posts:
+        changes.update(group_changes(post.pub_date, post.group_id, group_id))
+    apply(changes)
+
+
+def drop_group(group_id):
+    PostRollup.objects.filter(
+        scope=PostRollup.GROUP, scope_id=group_id
+    ).delete()
+
+
+def rebuild(batch_size=None):
+    """Recount everything from the posts; returns the number of rollups."""
+    batch_size = batch_size or settings.BULK_ACTION_CHUNK_SIZE
+    changes = Counter()
+    for queryset in (Post.objects.all(), ArchivedPost.objects.all()):
+        queryset = queryset.select_related(None).only(*FIELDS)
+        for batch in sharding.batches(queryset, batch_size):
+            changes.update(count(batch, 1))
+    with transaction.atomic():
+        PostRollup.objects.all().delete()
+        PostRollup.objects.bulk_create(
+            [
+                PostRollup(scope=scope, scope_id=scope_id, period=period,
+                           start=start, posts=posts)
+                for (scope, scope_id, period, start), posts in changes.items()
+            ],
+            batch_size=batch_size
+        )
+    return len(changes)
+
+
+def months(scope, scope_id=0):
+    return PostRollup.objects.filter(
+        scope=scope, scope_id=scope_id, period=PostRollup.MONTH, posts__gt=0
+    )
+
+
+def days(scope, scope_id, year, month):
+    first = date(year, month, 1)
+    last = first.replace(day=calendar.monthrange(year, month)[1])
+    return PostRollup.objects.filter(
+        scope=scope, scope_id=scope_id, period=PostRollup.DAY,
+        start__range=(first, last), posts__gt=0
+    ).order_by('start')
@@ -0,0 +1,230 @@
+"""Optional author-sharded storage of posts and comments.
+
+Posts live on ``POST_SHARDS[author_id % len(POST_SHARDS)]`` and comments
+are stored next to their post. Every shard hands out ids from its own
+range of ``POST_SHARD_ID_RANGE`` values, so a post id alone is enough to
+find its shard. With an empty ``POST_SHARDS`` all helpers fall back to
+plain single-database querysets.
+"""
+import heapq
+from collections import defaultdict
+from itertools import islice
+from operator import attrgetter
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import prefetch_related_objects
+
+from .models import Comment, Group, Post, User
+
+SHARDED_MODELS = (Post, Comment)
+
+# Foreign keys of the sharded models that have no database constraint,
+# sharded or not, since a shard cannot point into another database.
+UNCONSTRAINED_REFERENCES = (
+    (Post, 'author_id', User),
+    (Post, 'group_id', Group),
+    (Comment, 'author_id', User),
+)
+
+
+def is_enabled():
+    return bool(settings.POST_SHARDS)
+
+
+def shard_for_author(author_id):
+    shards = settings.POST_SHARDS
+    return shards[author_id % len(shards)]
+
+
+def shard_for_post(post_id):
+    shards = settings.POST_SHARDS
+    index = min(post_id // settings.POST_SHARD_ID_RANGE, len(shards) - 1)
+    return shards[index]
+
+
+def prepare_shards(using=None):
+    """Move the shards' autoincrement counters into their own id ranges."""
+    for index, alias in enumerate(settings.POST_SHARDS):
+        if using is not None and alias != using:
+            continue
+        floor = index * settings.POST_SHARD_ID_RANGE
+        with connections[alias].cursor() as cursor:
+            for model in SHARDED_MODELS:
+                table = model._meta.db_table
+                cursor.execute(
+                    'SELECT seq FROM sqlite_sequence WHERE name = %s', [table]
+                )
+                row = cursor.fetchone()
+                if row is None:
+                    cursor.execute(
+                        'INSERT INTO sqlite_sequence (name, seq) '
+                        'VALUES (%s, %s)', [table, floor]
+                    )
+                elif row[0] < floor:
+                    cursor.execute(
+                        'UPDATE sqlite_sequence SET seq = %s WHERE name = %s',
+                        [floor, table]
+                    )
+
+
+def related(queryset, *fields):
+    """select_related() that keeps working across database boundaries."""
+    if is_enabled():
+        return queryset.prefetch_related(*fields)
+    return queryset.select_related(*fields)
+
+
+def posts_by_id(post_id):
+    if is_enabled():
+        return Post.objects.using(shard_for_post(post_id))
+    return Post.objects.all()
+
+
+def in_bulk(ids, *fields):
+    """Posts by id, fetched with one query per involved shard."""
+    if not is_enabled():
+        return Post.objects.select_related(*fields).in_bulk(ids)
+    ids_by_shard = defaultdict(list)
+    for post_id in ids:
+        ids_by_shard[shard_for_post(post_id)].append(post_id)
+    posts = {}
+    for alias, shard_ids in ids_by_shard.items():
+        posts.update(Post.objects.using(alias).in_bulk(shard_ids))
+    prefetch_related_objects(list(posts.values()), *fields)
+    return posts
+
+
+def values(queryset, field):
+    """Distinct values of ``field`` of the posts of every shard."""
+    if not is_enabled():
+        return set(queryset.values_list(field, flat=True).distinct())
+    return {
+        value
+        for alias in settings.POST_SHARDS
+        for value in queryset.using(alias).values_list(field, flat=True)
+        .distinct()
+    }
+
+
+def dangling_references(chunk_size=1000):
+    """(model, field, missing ids) of every unconstrained foreign key.
+
+    Nothing but the code that deletes users and groups keeps these rows
+    consistent, so this is the integrity check the database cannot do.
+    """
+    for model, field, target in UNCONSTRAINED_REFERENCES:
+        ids = sorted(
+            values(model.objects.exclude(**{field: None}), field)
+        )
+        missing = []
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            found = set(
+                target.objects.filter(pk__in=chunk)
+                .values_list('pk', flat=True)
+            )
+            missing += [pk for pk in chunk if pk not in found]
+        yield model, field, missing
+
+
+def querysets(queryset):
+    """``queryset`` once per shard, or alone without sharding."""
+    if not is_enabled():
+        return [queryset]
+    return [queryset.using(alias) for alias in settings.POST_SHARDS]
+
+
+def batches(queryset, batch_size):
+    """Lists of rows of ``queryset`` from every shard in primary key order.
+
+    Every batch comes from a single database, read from the first primary
+    key past the previous batch, so rows may be changed or deleted batch
+    by batch while iterating.
+    """
+    aliases = settings.POST_SHARDS if queryset.model in SHARDED_MODELS else []
+    for alias in aliases or [None]:
+        posts = queryset.using(alias) if alias else queryset
+        posts = posts.order_by('pk')
+        last_pk = 0
+        while True:
+            batch = list(posts.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            yield batch
+            last_pk = batch[-1].pk
+
+
+def scatter(queryset, *fields):
+    """Newest-first posts of ``queryset`` gathered from every shard."""
+    if is_enabled():
+        return ShardedFeed(queryset, fields)
+    return queryset.select_related(*fields)
+
+
+class ShardedFeed:
+    """Paginator-compatible merge of per-shard querysets on pub_date."""
+
+    ordered = True
+
+    def __init__(self, queryset, fields=()):
+        self.queryset = queryset
+        self.fields = fields
+
+    def shard_querysets(self):
+        return [self.queryset.using(alias) for alias in settings.POST_SHARDS]
+
+    def count(self):
+        return sum(queryset.count() for queryset in self.shard_querysets())
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start, stop = key.start or 0, key.stop
+        merged = heapq.merge(
+            *(queryset[:stop] for queryset in self.shard_querysets()),
+            key=attrgetter('pub_date', 'pk'),
+            reverse=True
+        )
+        posts = list(islice(merged, start, stop))
+        prefetch_related_objects(posts, *self.fields)
+        return posts
+
+
+class AuthorShardRouter:
+    def _shard(self, model, instance):
+        if not is_enabled() or instance is None:
+            return None
+        if model not in SHARDED_MODELS:
+            return None
+        if instance._state.db in settings.POST_SHARDS:
+            return instance._state.db
+        if isinstance(instance, Post):
+            if model is Comment:
+                return shard_for_post(instance.pk)
+            return shard_for_author(instance.author_id)
+        if isinstance(instance, Comment):
+            return shard_for_post(instance.post_id)
+        if isinstance(instance, User) and model is Post:
+            return shard_for_author(instance.pk)
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self._shard(model, hints.get('instance'))
+
+    def db_for_write(self, model, **hints):
+        return self._shard(model, hints.get('instance'))
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if is_enabled() and (
+            isinstance(obj1, SHARDED_MODELS)
+            or isinstance(obj2, SHARDED_MODELS)
+        ):
+            return True
+        return None
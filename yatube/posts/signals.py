@@ -0,0 +1,203 @@
+from django.db import transaction
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from core import pagecache
+
+from . import (archive, bulk, cards, catalog, erasure, feed_cache, feeds,
+               following, notifications, rendering, rollups, sharding,
+               sitemaps)
+from .models import ArchivedPost, Comment, Follow, Group, Post, User
+
+
+@receiver(pre_save, sender=Post)
+def render_post(sender, instance, **kwargs):
+    rendering.render(instance)
+
+
+# Anonymous pages show posts, groups, comments and author names, but
+# never follows, so only changes of those rotate the page cache.
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_pages(sender, **kwargs):
+    if kwargs.get('update_fields') == frozenset(['last_login']):
+        return
+    pagecache.invalidate()
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_follow_feed(sender, instance, **kwargs):
+    following.invalidate(instance.user_id)
+    feed_cache.invalidate(instance.user_id)
+
+
+@receiver(following.follows_changed)
+def invalidate_after_bulk_follow(sender, user_id, **kwargs):
+    following.invalidate(user_id)
+    feed_cache.invalidate(user_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_followers_feeds(sender, instance, **kwargs):
+    if kwargs.get('created', True):
+        feed_cache.invalidate_followers(instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+def bump_new_posts(sender, instance, created, **kwargs):
+    if created:
+        notifications.bump(instance)
+
+
+@receiver(post_save, sender=Post)
+def sync_post_card(sender, instance, **kwargs):
+    if cards.is_enabled():
+        cards.sync(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_card(sender, instance, **kwargs):
+    if cards.is_enabled():
+        cards.remove(instance.pk)
+
+
+# User fields copied into post cards.
+CARD_USER_FIELDS = frozenset(['username', 'first_name', 'last_name'])
+
+
+@receiver(post_save, sender=User)
+def sync_author_cards(sender, instance, created, update_fields, **kwargs):
+    if update_fields is not None and not CARD_USER_FIELDS & update_fields:
+        return
+    if cards.is_enabled() and not created:
+        cards.sync_author(instance)
+
+
+@receiver(post_delete, sender=User)
+def drop_author_cards(sender, instance, **kwargs):
+    if cards.is_enabled():
+        cards.drop_author(instance.pk)
+
+
+@receiver(post_save, sender=Group)
+def sync_group_cards(sender, instance, created, **kwargs):
+    if cards.is_enabled() and not created:
+        cards.sync_group(instance)
+
+
+@receiver(post_delete, sender=Group)
+def drop_group_cards(sender, instance, **kwargs):
+    if cards.is_enabled():
+        cards.drop_group(instance.pk)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_catalog(sender, using, **kwargs):
+    # Another process could reload the catalog before the change commits
+    # and keep the old groups under the new version.
+    transaction.on_commit(catalog.invalidate, using=using)
+
+
+@receiver(post_save, sender=Post)
+def count_post(sender, instance, created, **kwargs):
+    if created:
+        rollups.added(instance)
+    elif instance.saved_group_id() != instance.group_id:
+        rollups.apply(rollups.group_changes(
+            instance.pub_date, instance.saved_group_id(), instance.group_id
+        ))
+
+
+@receiver(post_delete, sender=Post)
+def uncount_post(sender, instance, **kwargs):
+    rollups.removed(instance)
+
+
+@receiver(post_delete, sender=Group)
+def drop_group_rollups(sender, instance, **kwargs):
+    rollups.drop_group(instance.pk)
+
+
+# The deletion collector only sees the default database and skips the
+# archive, whose foreign keys do nothing on delete; the rows it cannot
+# reach are removed or updated here, before the instance goes.
+@receiver(pre_delete, sender=Group)
+def ungroup_posts(sender, instance, **kwargs):
+    bulk.reassign_group(Post.objects.filter(group_id=instance.pk), None)
+    ArchivedPost.objects.filter(group_id=instance.pk).update(group=None)
+
+
+@receiver(pre_delete, sender=User)
+def delete_author_content(sender, instance, **kwargs):
+    if sharding.is_enabled():
+        erasure.delete_content(instance.pk)
+    else:
+        # Without shards the collector deletes posts and comments itself.
+        archive.delete_author(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def change_post_sitemap(sender, instance, **kwargs):
+    if kwargs.get('created', True):
+        sitemaps.changed(sitemaps.POSTS, [instance.pk])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def change_profile_sitemap(sender, instance, **kwargs):
+    if kwargs.get('update_fields') != frozenset(['last_login']):
+        sitemaps.changed(sitemaps.PROFILES, [instance.pk])
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def change_group_sitemap(sender, instance, **kwargs):
+    sitemaps.changed(sitemaps.GROUPS, [instance.pk])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def change_post_feeds(sender, instance, **kwargs):
+    feeds.changed(
+        [instance.author_id],
+        [instance.group_id, instance.saved_group_id()]
+    )
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, update_fields, **kwargs):
+    if instance._state.adding or (
+        update_fields is not None and 'username' not in update_fields
+    ):
+        return
+    instance._saved_username = (
+        User.objects.filter(pk=instance.pk)
+        .values_list('username', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def change_author_feeds(sender, instance, **kwargs):
+    if kwargs.get('update_fields') != frozenset(['last_login']):
+        feeds.changed(author_ids=[instance.pk])
+        feeds.forget_authors([
+            instance.username, getattr(instance, '_saved_username', None)
+        ])
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def change_group_feeds(sender, instance, **kwargs):
+    feeds.changed(group_ids=[instance.pk])
@@ -0,0 +1,178 @@
+"""Sitemaps of posts, profiles and groups split into id ranges.
+
+Shard ``n`` of a section lists the objects with ids from
+``n * SITEMAP_SHARD_SIZE`` up to the next shard. Creating or deleting an
+object replaces the version of its shard in the cache; a shard is
+rendered again only when no file in SITEMAP_DIR carries its current
+version. Versions are nanosecond timestamps, so they double as the
+lastmod of the shard in the sitemap index.
+"""
+import os
+import tempfile
+import time
+from datetime import datetime
+from glob import glob
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import ExpressionWrapper, F, IntegerField
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+
+from core.versions import get_versions
+
+from . import sharding
+from .models import ArchivedPost, Group, Post, User
+
+POSTS = 'posts'
+PROFILES = 'profiles'
+GROUPS = 'groups'
+SECTIONS = (POSTS, PROFILES, GROUPS)
+
+
+def version_key(section, shard):
+    return f'sitemap.{section}.{shard}'
+
+
+def shards_key(section):
+    return f'sitemap.{section}.shards'
+
+
+def shard_of(pk):
+    return pk // settings.SITEMAP_SHARD_SIZE
+
+
+def changed(section, ids):
+    """Mark the shards holding ``ids`` of ``section`` as changed."""
+    shards = {shard_of(pk) for pk in ids}
+    if not shards:
+        return
+    now = time.time_ns()
+    cache.set_many(
+        {version_key(section, shard): now for shard in shards}, None
+    )
+    known = cache.get(shards_key(section))
+    if known is not None and not shards.issubset(known):
+        cache.delete(shards_key(section))
+
+
+def versions(section, shards):
+    keys = {version_key(section, shard): shard for shard in shards}
+    found = get_versions(cache, list(keys), time.time_ns)
+    return {keys[key]: version for key, version in found.items()}
+
+
+def querysets(section):
+    if section == POSTS:
+        return sharding.querysets(Post.objects.all()) + [
+            ArchivedPost.objects.all()
+        ]
+    if section == PROFILES:
+        return [User.objects.filter(is_active=True)]
+    return [Group.objects.all()]
+
+
+def shards(section):
+    """Numbers of the non-empty shards of ``section``, cached for a while."""
+    numbers = cache.get(shards_key(section))
+    if numbers is None:
+        shard = ExpressionWrapper(
+            F('pk') / settings.SITEMAP_SHARD_SIZE, output_field=IntegerField()
+        )
+        numbers = sorted({
+            number
+            for queryset in querysets(section)
+            for number in queryset.order_by().annotate(shard=shard)
+            .values_list('shard', flat=True).distinct()
+        })
+        cache.set(
+            shards_key(section), numbers, settings.SITEMAP_INDEX_TIMEOUT
+        )
+    return numbers
+
+
+def entries(section, shard):
+    """(path, lastmod) of every object of a shard."""
+    size = settings.SITEMAP_SHARD_SIZE
+    bounds = {'pk__gte': shard * size, 'pk__lt': (shard + 1) * size}
+    for queryset in querysets(section):
+        queryset = queryset.filter(**bounds).order_by('pk')
+        if section == POSTS:
+            for pk, pub_date in queryset.values_list('pk', 'pub_date'):
+                yield reverse('posts:post_detail', args=[pk]), pub_date
+        elif section == PROFILES:
+            for username in queryset.values_list('username', flat=True):
+                yield reverse('posts:profile', args=[username]), None
+        else:
+            for slug in queryset.values_list('slug', flat=True):
+                yield reverse('posts:group_list', args=[slug]), None
+
+
+def canonical_url(location):
+    """``location`` on SITE_URL, whatever host the request came to."""
+    return urljoin(settings.SITE_URL, location)
+
+
+def lastmod(version):
+    return datetime.fromtimestamp(version / 1e9, tz=timezone.utc)
+
+
+def shard_file(section, shard, version):
+    return os.path.join(
+        settings.SITEMAP_DIR, f'{section}-{shard}-{version}.xml'
+    )
+
+
+def build(section, shard):
+    """Path of the up-to-date file of a shard, rendered when missing."""
+    version = versions(section, [shard])[shard]
+    path = shard_file(section, shard, version)
+    if os.path.exists(path):
+        return path
+    content = render_to_string('posts/sitemap.xml', {
+        'urls': [
+            (canonical_url(location), modified)
+            for location, modified in entries(section, shard)
+        ],
+    })
+    os.makedirs(settings.SITEMAP_DIR, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        'w', encoding='utf-8', dir=settings.SITEMAP_DIR, delete=False
+    ) as temporary:
+        temporary.write(content)
+    os.replace(temporary.name, path)
+    for old in glob(shard_file(section, shard, '*')):
+        # A newer file may have been written by another worker meanwhile.
+        if file_version(old) < version:
+            try:
+                os.remove(old)
+            except FileNotFoundError:
+                pass
+    return path
+
+
+def file_version(path):
+    return int(os.path.basename(path).rsplit('-', 1)[1].split('.')[0])
+
+
+def open_shard(section, shard):
+    """The file of a shard, rebuilt if it was replaced while opening it."""
+    try:
+        return open(build(section, shard), 'rb')
+    except FileNotFoundError:
+        return open(build(section, shard), 'rb')
+
+
+def index():
+    """(location, lastmod) of every shard of every section."""
+    for section in SECTIONS:
+        numbers = shards(section)
+        shard_versions = versions(section, numbers)
+        for shard in numbers:
+            location = reverse('posts:sitemap', args=[section, shard])
+            yield (
+                canonical_url(location),
+                lastmod(shard_versions[shard])
+            )
@@ -0,0 +1,11 @@
+from django import template
+
+from posts.catalog import catalog
+
+register = template.Library()
+
+
+@register.filter
+def group_slug(group_id):
+    group = catalog.by_id(group_id)
+    return group.slug if group else ''
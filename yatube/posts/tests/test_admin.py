@@ -0,0 +1,133 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import feed_cache
+from ..models import Comment, Follow, Group, Post, PostCard
+
+User = get_user_model()
+
+
+class PostAdminTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'admin'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create([
+            Post(author=cls.admin, group=cls.group, text=f'Пост {number}')
+            for number in range(105)
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:posts_post_changelist')
+
+    def test_queries_do_not_grow_with_rows(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.context['cl'].result_list), 100)
+        self.assertLessEqual(len(queries), 6)
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertContains(
+            response, f'<option value="{self.group.pk}" selected>'
+        )
+
+    def test_keyset_navigation(self):
+        response = self.client.get(self.url)
+        oldest_on_page = list(response.context['cl'].result_list)[-1].pk
+        keyset_query = response.context['cl'].keyset_query
+        self.assertEqual(keyset_query, f'?before={oldest_on_page}')
+        response = self.client.get(self.url + keyset_query)
+        self.assertEqual(len(response.context['cl'].result_list), 5)
+        self.assertTrue(all(
+            post.pk < oldest_on_page
+            for post in response.context['cl'].result_list
+        ))
+        self.assertIsNone(response.context['cl'].keyset_query)
+
+    @override_settings(ADMIN_COUNT_LIMIT=50)
+    def test_count_is_capped(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['cl'].result_count, 101)
+        self.assertEqual(len(response.context['cl'].result_list), 100)
+        self.assertIsNone(response.context['cl'].full_result_count)
+
+
+@override_settings(BULK_ACTION_CHUNK_SIZE=2, POST_CARDS_ENABLED=True)
+class BulkActionsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'admin'
+        )
+        self.spammer = User.objects.create_user(username='spammer')
+        self.follower = User.objects.create_user(username='follower')
+        Follow.objects.create(user=self.follower, author=self.spammer)
+        self.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug', description=''
+        )
+        self.posts = [
+            Post.objects.create(author=self.spammer, text=f'Спам {number}')
+            for number in range(5)
+        ]
+        self.own_post = Post.objects.create(author=self.admin, text='Пост')
+        Comment.objects.create(
+            post=self.posts[0], author=self.admin, text='Ответ'
+        )
+        Comment.objects.create(
+            post=self.own_post, author=self.spammer, text='Спам'
+        )
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def run_action(self, model, action, selected, **data):
+        return self.client.post(
+            reverse(f'admin:posts_{model}_changelist'),
+            {'action': action, '_selected_action': selected, **data},
+            follow=True
+        )
+
+    def test_reassign_group_asks_for_group_then_updates(self):
+        ids = [post.pk for post in self.posts]
+        response = self.run_action('post', 'reassign_group', ids)
+        self.assertTemplateUsed(
+            response, 'admin/posts/post/reassign_group.html'
+        )
+        response = self.run_action(
+            'post', 'reassign_group', ids, group=self.group.pk, apply='1'
+        )
+        self.assertContains(response, 'Перенесено постов: 5')
+        self.assertEqual(Post.objects.filter(group=self.group).count(), 5)
+        self.assertEqual(
+            PostCard.objects.filter(group_slug='test-slug').count(), 5
+        )
+
+    def test_delete_posts_removes_comments_cards_and_feeds(self):
+        feed_cache.FollowFeed(self.follower)
+        response = self.run_action(
+            'post', 'delete_posts', [self.own_post.pk], select_across='1'
+        )
+        self.assertContains(response, 'Удалено постов: 6')
+        self.assertFalse(Post.objects.exists())
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(PostCard.objects.exists())
+        self.assertIsNone(cache.get(feed_cache.feed_key(self.follower.pk)))
+
+    def test_purge_authors_from_comments(self):
+        spam = Comment.objects.get(author=self.spammer)
+        response = self.run_action('comment', 'purge_authors', [spam.pk])
+        self.assertContains(response, 'Удалено постов: 5, комментариев: 1')
+        self.assertEqual(list(Post.objects.all()), [self.own_post])
+        self.assertFalse(Comment.objects.exists())
@@ -0,0 +1,100 @@
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import archive
+from ..models import Comment, Group, Post
+
+User = get_user_model()
+
+
+def read(response):
+    return b''.join(response.streaming_content).decode()
+
+
+@override_settings(API_CHUNK_SIZE=2)
+class ReadApiTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(
+            username='author', first_name='Лев', last_name='Толстой'
+        )
+        self.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        self.posts = [
+            Post.objects.create(author=self.author, group=self.group,
+                                text=f'Пост {number}')
+            for number in range(5)
+        ]
+        self.comment = Comment.objects.create(
+            post=self.posts[0], author=self.author, text='Комментарий'
+        )
+        self.client = Client()
+
+    def get(self, name, *args, **params):
+        return self.client.get(reverse(f'posts:{name}', args=args), params)
+
+    def test_posts_follow_cursor_across_pages(self):
+        response = self.get('api_posts', limit=3)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        page = json.loads(read(response))
+        self.assertEqual(
+            [post['id'] for post in page['results']],
+            [post.pk for post in self.posts[:1:-1]]
+        )
+        self.assertEqual(page['results'][0]['author'], 'author')
+        self.assertEqual(page['results'][0]['group'], 'group')
+        page = json.loads(read(self.client.get(page['next'])))
+        self.assertEqual(
+            [post['id'] for post in page['results']],
+            [self.posts[1].pk, self.posts[0].pk]
+        )
+        self.assertIsNone(page['next'])
+
+    def test_field_selection(self):
+        page = json.loads(read(self.get('api_posts', fields='id,text')))
+        self.assertEqual(
+            page['results'][0], {'id': self.posts[4].pk, 'text': 'Пост 4'}
+        )
+        response = self.get('api_posts', fields='id,password')
+        self.assertEqual(response.status_code, 400)
+
+    def test_ndjson_streams_archived_posts_too(self):
+        Post.objects.filter(pk=self.posts[0].pk).update(
+            pub_date=timezone.now() - timedelta(days=400)
+        )
+        archive.archive_old_posts(days=30)
+        response = self.get(
+            'api_profile_posts', 'author', format='ndjson', fields='id'
+        )
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = read(response).splitlines()
+        self.assertEqual(
+            [json.loads(line)['id'] for line in lines],
+            [post.pk for post in reversed(self.posts)]
+        )
+        comments = json.loads(read(
+            self.get('api_post_comments', self.posts[0].pk)
+        ))
+        self.assertEqual(comments['results'][0]['text'], 'Комментарий')
+
+    def test_group_posts_and_catalog(self):
+        other = Post.objects.create(author=self.author, text='Без группы')
+        page = json.loads(read(self.get('api_group_posts', 'group')))
+        self.assertNotIn(other.pk, [post['id'] for post in page['results']])
+        groups = json.loads(self.get('api_groups', fields='slug').content)
+        self.assertEqual(groups['results'], [{'slug': 'group'}])
+        self.assertEqual(
+            self.get('api_group_posts', 'missing').status_code, 404
+        )
+
+    def test_profile(self):
+        profile = json.loads(self.get('api_profile', 'author').content)
+        self.assertEqual(profile['full_name'], 'Лев Толстой')
+        self.assertEqual(profile['posts'], 5)
@@ -0,0 +1,167 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import archive, erasure
+from ..models import ArchivedComment, ArchivedPost, Comment, Post
+
+User = get_user_model()
+
+
+class PostArchiveTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.posts = [
+            Post.objects.create(author=self.author, text=f'Пост {number}')
+            for number in range(3)
+        ]
+        self.old_ids = [self.posts[0].pk, self.posts[1].pk]
+        for age, post_id in enumerate(self.old_ids):
+            Post.objects.filter(pk=post_id).update(
+                pub_date=timezone.now() - timedelta(days=400 - age)
+            )
+        Comment.objects.create(
+            post=self.posts[0], author=self.author, text='Старый комментарий'
+        )
+
+    def archive(self):
+        out = StringIO()
+        call_command('archive_posts', '--days=30', '--batch-size=1',
+                     stdout=out)
+        return out.getvalue()
+
+    def test_old_posts_move_with_comments(self):
+        self.assertIn('Posts archived: 2', self.archive())
+        self.assertEqual(list(Post.objects.all()), [self.posts[2]])
+        self.assertEqual(
+            set(ArchivedPost.objects.values_list('pk', flat=True)),
+            set(self.old_ids)
+        )
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(
+            ArchivedComment.objects.get().post_id, self.old_ids[0]
+        )
+        self.assertIn('Posts archived: 0', self.archive())
+
+    def test_changes_after_the_snapshot_are_kept(self):
+        batch = list(Post.objects.filter(pk__in=self.old_ids).order_by('pk'))
+        Post.objects.filter(pk=self.old_ids[0]).update(text='Исправлен')
+        Comment.objects.create(
+            post=batch[1], author=self.author, text='Поздний комментарий'
+        )
+        moved = archive.move_batch(batch)
+        self.assertEqual([post.pk for post in moved], [self.old_ids[1]])
+        self.assertEqual(
+            Post.objects.get(pk=self.old_ids[0]).text, 'Исправлен'
+        )
+        self.assertTrue(
+            ArchivedComment.objects.filter(text='Поздний комментарий')
+            .exists()
+        )
+
+    def test_post_detail_falls_back_to_archive(self):
+        self.archive()
+        response = Client().get(
+            reverse('posts:post_detail', args=[self.old_ids[0]])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['post'].text, 'Пост 0')
+        self.assertEqual(response.context['count_post'], 3)
+        self.assertContains(response, 'Старый комментарий')
+
+    def test_profile_lists_hot_then_archived_posts(self):
+        self.archive()
+        response = Client().get(
+            reverse('posts:profile', args=[self.author.username])
+        )
+        self.assertEqual(response.context['posts_amount'], 3)
+        self.assertEqual(
+            [post.pk for post in response.context['page_obj']],
+            [self.posts[2].pk, self.old_ids[1], self.old_ids[0]]
+        )
+
+    def test_archived_authors_are_prefetched(self):
+        self.archive()
+        url = reverse('posts:profile', args=[self.author.username])
+        with CaptureQueriesContext(connection) as two_archived:
+            Client().get(url)
+        older = Post.objects.create(author=self.author, text='Пост 3')
+        Post.objects.filter(pk=older.pk).update(
+            pub_date=timezone.now() - timedelta(days=300)
+        )
+        self.archive()
+        cache.clear()
+        with CaptureQueriesContext(connection) as three_archived:
+            Client().get(url)
+        self.assertEqual(len(three_archived), len(two_archived))
+
+    def test_chained_feed_slices_across_feeds(self):
+        feed = archive.ChainedFeed([1, 2, 3], [4, 5])
+        feed.counts = [3, 2]
+        self.assertEqual(feed[2:4], [3, 4])
+        self.assertEqual(feed[4], 5)
+        self.assertEqual(feed.count(), 5)
+
+    def test_user_deletion_removes_archived_rows(self):
+        self.archive()
+        erasure.run(erasure.schedule(self.author))
+        self.assertFalse(ArchivedPost.objects.exists())
+        self.assertFalse(ArchivedComment.objects.exists())
+
+    def test_plain_user_delete_removes_archived_rows(self):
+        self.archive()
+        self.author.delete()
+        self.assertFalse(ArchivedPost.objects.exists())
+        self.assertFalse(ArchivedComment.objects.exists())
+
+
+class ArchivedImageTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        cls.media_settings = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media_settings.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.media_settings.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+
+    def test_erasure_removes_images_of_archived_posts(self):
+        author = User.objects.create_user(username='author')
+        post = Post.objects.create(
+            author=author, text='Пост с картинкой',
+            image=SimpleUploadedFile(
+                name='small.gif',
+                content=(
+                    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+                    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+                    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+                    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+                    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+                    b'\x0A\x00\x3B'
+                ),
+                content_type='image/gif'
+            )
+        )
+        name = post.image.name
+        archive.move(Post.objects.filter(pk=post.pk))
+        self.assertTrue(default_storage.exists(name))
+        erasure.run(erasure.schedule(author))
+        self.assertFalse(default_storage.exists(name))
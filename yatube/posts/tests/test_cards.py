@@ -0,0 +1,95 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import cards
+from ..models import Follow, Group, Post, PostCard
+
+User = get_user_model()
+
+
+@override_settings(POST_CARDS_ENABLED=True, POST_EXCERPT_LENGTH=20)
+class PostCardTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(
+            username='author', first_name='Лев', last_name='Толстой'
+        )
+        self.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        self.post = Post.objects.create(
+            author=self.author, group=self.group, text='Очень ' * 10
+        )
+
+    def test_card_follows_post(self):
+        card = PostCard.objects.get(pk=self.post.pk)
+        self.assertEqual(card.author_username, 'author')
+        self.assertEqual(card.author_full_name, 'Лев Толстой')
+        self.assertEqual(card.group_slug, 'test-slug')
+        self.assertEqual(len(card.excerpt_html), len('<p></p>') + 20)
+        self.post.delete()
+        self.assertFalse(PostCard.objects.exists())
+
+    def test_card_follows_author_and_group(self):
+        self.author.first_name = 'Алексей'
+        self.author.save()
+        self.group.slug = 'new-slug'
+        self.group.save()
+        card = PostCard.objects.get(pk=self.post.pk)
+        self.assertEqual(card.author_full_name, 'Алексей Толстой')
+        self.assertEqual(card.group_slug, 'new-slug')
+        self.group.delete()
+        card.refresh_from_db()
+        self.assertIsNone(card.group_id)
+        self.assertEqual(card.group_slug, '')
+
+    def test_login_does_not_touch_cards(self):
+        with mock.patch.object(cards, 'sync_author') as sync_author:
+            update_last_login(None, self.author)
+            sync_author.assert_not_called()
+            self.author.save(update_fields=['last_name'])
+            sync_author.assert_called_once_with(self.author)
+
+    def test_feeds_read_cards_without_joins(self):
+        self.assertNotIn('JOIN', str(cards.feed(group_id=1).query))
+        feeds = [
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.author.username]),
+        ]
+        for url in feeds:
+            with self.subTest(url=url):
+                response = Client().get(url)
+                card = response.context['page_obj'][0]
+                self.assertIsInstance(card, PostCard)
+                self.assertContains(response, 'Лев Толстой')
+                self.assertContains(
+                    response, reverse('posts:group_list', args=['test-slug'])
+                )
+
+    def test_follow_feed_reads_cards(self):
+        follower = User.objects.create_user(username='follower')
+        Follow.objects.create(user=follower, author=self.author)
+        client = Client()
+        client.force_login(follower)
+        response = client.get(reverse('posts:follow_index'))
+        self.assertEqual(
+            list(response.context['page_obj']),
+            [PostCard.objects.get(pk=self.post.pk)]
+        )
+
+    def test_rebuild_command(self):
+        PostCard.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_post_cards', '--batch-size=1', stdout=out)
+        self.assertIn('Post cards built: 1', out.getvalue())
+        self.assertTrue(PostCard.objects.filter(pk=self.post.pk).exists())
@@ -0,0 +1,73 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from .. import catalog
+from ..forms import PostForm
+from ..models import Group
+
+
+class GroupCatalogTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.catalog = catalog.GroupCatalog()
+
+    def test_lookups_after_load_do_not_query(self):
+        self.catalog.all()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.catalog.by_slug('test-slug'), self.group)
+            self.assertEqual(self.catalog.by_id(self.group.pk), self.group)
+            self.assertIsNone(self.catalog.by_slug('missing'))
+
+    def test_version_change_reloads(self):
+        self.catalog.all()
+        Group.objects.filter(pk=self.group.pk).update(title='Новое название')
+        self.assertEqual(
+            self.catalog.by_id(self.group.pk).title, 'Тестовая группа'
+        )
+        catalog.invalidate()
+        self.assertEqual(
+            self.catalog.by_id(self.group.pk).title, 'Новое название'
+        )
+
+    def test_catalog_loads_without_a_version(self):
+        with mock.patch.object(catalog, 'current_version', return_value=None):
+            self.assertEqual(self.catalog.by_slug('test-slug'), self.group)
+            Group.objects.create(title='Вторая', slug='second')
+            self.assertIsNotNone(self.catalog.by_slug('second'))
+
+    def test_form_choices_come_from_catalog(self):
+        catalog.catalog.all()
+        with self.assertNumQueries(0):
+            html = PostForm().as_p()
+        self.assertIn('Тестовая группа', html)
+
+    def test_unknown_slug_is_404(self):
+        response = Client().get(reverse('posts:group_list', args=['missing']))
+        self.assertEqual(response.status_code, 404)
+
+
+class GroupCatalogCommitTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.catalog = catalog.GroupCatalog()
+
+    def test_group_save_invalidates_after_commit(self):
+        self.catalog.all()
+        version = cache.get(catalog.VERSION_KEY)
+        with transaction.atomic():
+            Group.objects.create(title='Вторая', slug='second', description='')
+            self.assertEqual(cache.get(catalog.VERSION_KEY), version)
+        self.assertIsNotNone(self.catalog.by_slug('second'))
@@ -0,0 +1,78 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import erasure, following
+from ..models import Comment, Follow, Post, UserDeletion
+
+User = get_user_model()
+
+
+@override_settings(BULK_ACTION_CHUNK_SIZE=2)
+class UserErasureTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(
+            username='author', password='password'
+        )
+        self.reader = User.objects.create_user(username='reader')
+        self.posts = [
+            Post.objects.create(author=self.author, text=f'Пост {number}')
+            for number in range(5)
+        ]
+        own_post = Post.objects.create(author=self.reader, text='Пост')
+        Comment.objects.create(post=own_post, author=self.author, text='К')
+        Comment.objects.create(post=self.posts[0], author=self.reader,
+                               text='Ответ')
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=self.author, author=self.reader)
+
+    def test_schedule_tombstones_at_once(self):
+        job = erasure.schedule(self.author)
+        self.author.refresh_from_db()
+        self.assertFalse(self.author.is_active)
+        self.assertFalse(self.author.has_usable_password())
+        self.assertFalse(
+            Client().login(username='author', password='password')
+        )
+        self.assertIsNone(job.finished)
+        self.assertEqual(Post.objects.filter(author=self.author).count(), 5)
+
+    def test_run_removes_history_in_batches(self):
+        following.followed_ids(self.reader)
+        job = erasure.schedule(self.author)
+        erasure.run(job)
+        self.assertFalse(User.objects.filter(pk=self.author.pk).exists())
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(Follow.objects.exists())
+        self.assertIsNone(cache.get(following.following_key(self.reader.pk)))
+        self.assertIsNotNone(UserDeletion.objects.get(pk=job.pk).finished)
+
+    def test_command_resumes_unfinished_jobs(self):
+        erasure.schedule(self.author)
+        out = StringIO()
+        call_command('process_user_deletions', stdout=out)
+        self.assertIn('User deletions finished: 1', out.getvalue())
+        self.assertFalse(User.objects.filter(pk=self.author.pk).exists())
+
+    def test_admin_delete_schedules_job(self):
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'admin'
+        )
+        client = Client()
+        client.force_login(admin)
+        with mock.patch.object(erasure.executor, 'submit'):
+            client.post(
+                reverse('admin:auth_user_delete', args=[self.author.pk]),
+                {'post': 'yes'}
+            )
+        self.assertTrue(
+            UserDeletion.objects.filter(user_id=self.author.pk).exists()
+        )
+        self.assertTrue(User.objects.filter(pk=self.author.pk).exists())
@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import feed_cache
+from ..models import Follow, Post
+
+User = get_user_model()
+
+
+class FollowFeedCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.follower = User.objects.create_user(username='follower')
+        Follow.objects.create(user=cls.follower, author=cls.author)
+        cls.posts = [
+            Post.objects.create(author=cls.author, text=f'Пост {number}')
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.follower)
+        self.key = feed_cache.feed_key(self.follower.pk)
+
+    def test_cached_ids_hydrated_with_one_query(self):
+        self.client.get(reverse('posts:follow_index'))
+        ids, total = cache.get(self.key)
+        self.assertEqual(ids, [post.pk for post in reversed(self.posts)])
+        self.assertEqual(total, 3)
+        with self.assertNumQueries(1):
+            posts = feed_cache.FollowFeed(self.follower)[0:10]
+            [post.author.username for post in posts]
+        self.assertEqual(posts, list(reversed(self.posts)))
+
+    def test_new_post_of_followed_author_invalidates(self):
+        feed_cache.FollowFeed(self.follower)
+        Post.objects.create(author=self.author, text='Новый пост')
+        self.assertIsNone(cache.get(self.key))
+
+    def test_unfollow_invalidates(self):
+        feed_cache.FollowFeed(self.follower)
+        self.client.get(
+            reverse('posts:profile_unfollow', args=[self.author.username])
+        )
+        self.assertIsNone(cache.get(self.key))
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(len(response.context['page_obj']), 0)
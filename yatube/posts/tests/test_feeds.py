@@ -0,0 +1,100 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import bulk
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class PostFeedsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(
+            username='author', first_name='Лев', last_name='Толстой'
+        )
+        self.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        self.post = Post.objects.create(
+            author=self.author, group=self.group, text='Первая запись'
+        )
+        self.client = Client()
+
+    def test_feeds_list_posts(self):
+        for name, args, content_type in (
+            ('posts:rss', [], 'application/rss+xml'),
+            ('posts:atom', [], 'application/atom+xml'),
+            ('posts:group_rss', ['group'], 'application/rss+xml'),
+            ('posts:profile_atom', ['author'], 'application/atom+xml'),
+        ):
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name, args=args))
+                self.assertTrue(response['Content-Type'].startswith(
+                    content_type
+                ))
+                self.assertContains(response, 'Первая запись')
+                self.assertContains(
+                    response, reverse('posts:post_detail', args=[self.post.pk])
+                )
+
+    @override_settings(SITE_URL='https://yatube.example')
+    def test_links_use_site_url(self):
+        for name, args in (
+            ('posts:rss', []),
+            ('posts:group_atom', ['group']),
+            ('posts:profile_rss', ['author']),
+        ):
+            with self.subTest(name=name):
+                response = self.client.get(
+                    reverse(name, args=args), HTTP_HOST='localhost'
+                )
+                self.assertContains(
+                    response, 'https://yatube.example'
+                    + reverse('posts:post_detail', args=[self.post.pk])
+                )
+                self.assertContains(
+                    response,
+                    'https://yatube.example' + reverse(name, args=args)
+                )
+                self.assertNotContains(response, 'localhost')
+
+    def test_unchanged_feed_is_served_from_cache(self):
+        url = reverse('posts:group_rss', args=['group'])
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response['ETag'], etag)
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_post_changes_replace_the_version(self):
+        url = reverse('posts:profile_rss', args=['author'])
+        etag = self.client.get(url)['ETag']
+        self.post.text = 'Исправленная запись'
+        self.post.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Исправленная запись')
+        etag = response['ETag']
+        bulk.delete_posts(Post.objects.all())
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertNotContains(response, 'Исправленная запись')
+
+    def test_unknown_group_is_404(self):
+        response = self.client.get(reverse('posts:group_atom', args=['no']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_old_name_of_a_renamed_author_follows_its_new_owner(self):
+        url = reverse('posts:profile_rss', args=['author'])
+        self.client.get(url)
+        self.author.username = 'writer'
+        self.author.save()
+        self.assertEqual(self.client.get(url).status_code, 404)
+        newcomer = User.objects.create_user(username='author')
+        self.client.get(url)
+        Post.objects.create(author=newcomer, text='Запись новичка')
+        self.assertContains(self.client.get(url), 'Запись новичка')
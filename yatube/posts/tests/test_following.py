@@ -0,0 +1,126 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import following
+from ..models import Follow, Group, Post
+
+User = get_user_model()
+
+
+class FollowGraphCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+        cls.followed = User.objects.create_user(username='followed')
+        cls.stranger = User.objects.create_user(username='stranger')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        for author in (cls.followed, cls.stranger):
+            Post.objects.create(author=author, text='Пост', group=cls.group)
+        Follow.objects.create(user=cls.user, author=cls.followed)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_followed_ids_cached(self):
+        with self.assertNumQueries(1):
+            following.followed_ids(self.user)
+        with self.assertNumQueries(0):
+            ids = following.followed_ids(self.user)
+        self.assertEqual(ids, {self.followed.pk})
+
+    def test_profile_knows_follow_state(self):
+        for author, expected in ((self.followed, True),
+                                 (self.stranger, False)):
+            with self.subTest(author=author.username):
+                response = self.client.get(
+                    reverse('posts:profile', args=[author.username])
+                )
+                self.assertEqual(response.context['following'], expected)
+
+    def test_post_cards_show_follow_buttons(self):
+        response = self.client.get(
+            reverse('posts:group_list', args=[self.group.slug])
+        )
+        self.assertContains(
+            response,
+            reverse('posts:profile_unfollow', args=[self.followed.username])
+        )
+        self.assertContains(
+            response,
+            reverse('posts:profile_follow', args=[self.stranger.username])
+        )
+
+    def test_unfollow_invalidates(self):
+        following.followed_ids(self.user)
+        self.client.get(
+            reverse('posts:profile_unfollow', args=[self.followed.username])
+        )
+        self.assertEqual(following.followed_ids(self.user), frozenset())
+
+
+class BulkFollowTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+        cls.authors = [
+            User.objects.create_user(username=f'author{number}')
+            for number in range(3)
+        ]
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        for author in cls.authors + [cls.user]:
+            Post.objects.create(author=author, text='Пост', group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_follow_is_idempotent(self):
+        author = self.authors[0]
+        for _ in range(2):
+            self.client.get(
+                reverse('posts:profile_follow', args=[author.username])
+            )
+        self.assertEqual(
+            Follow.objects.filter(user=self.user, author=author).count(), 1
+        )
+
+    def test_follow_queries_do_not_grow_with_authors(self):
+        with self.assertNumQueries(1):
+            following.follow(self.user, [a.pk for a in self.authors])
+        # delete() reads the rows once for the post_delete receivers.
+        with self.assertNumQueries(2):
+            following.unfollow(self.user, [a.pk for a in self.authors])
+        self.assertFalse(Follow.objects.exists())
+
+    def test_follow_everyone_in_group(self):
+        following.follow(self.user, [self.authors[0].pk])
+        url = reverse('posts:group_follow', args=[self.group.slug])
+        response = self.client.get(
+            reverse('posts:group_list', args=[self.group.slug])
+        )
+        self.assertContains(response, f'action="{url}"')
+        self.assertEqual(self.client.get(url).status_code, 405)
+        self.client.post(url)
+        self.assertEqual(
+            following.followed_ids(self.user),
+            {author.pk for author in self.authors}
+        )
+        self.client.post(
+            reverse('posts:group_unfollow', args=[self.group.slug])
+        )
+        self.assertEqual(following.followed_ids(self.user), frozenset())
@@ -0,0 +1,94 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Follow, Group, Post
+
+User = get_user_model()
+
+
+@override_settings(MAX_PAGE_AMOUNT=3)
+class FeedFragmentTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        self.group = Group.objects.create(title='Группа', slug='group')
+        self.posts = [
+            Post.objects.create(author=self.author, group=self.group,
+                                text=f'Пост {number}')
+            for number in range(5)
+        ]
+        self.client = Client()
+
+    def cursor(self, post):
+        return f'{post.pub_date.isoformat()},{post.pk}'
+
+    def test_index_page_points_to_fragments(self):
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(
+            response, f'data-fragments="{reverse("posts:index_fragment")}"'
+        )
+        self.assertContains(
+            response, f'data-cursor="{self.cursor(self.posts[2])}"'
+        )
+
+    def test_fragment_returns_cards_and_next_cursor(self):
+        url = reverse('posts:group_fragment', args=['group'])
+        response = self.client.get(url)
+        self.assertEqual(response['X-Next-Cursor'], self.cursor(self.posts[2]))
+        self.assertNotContains(response, '<html')
+        self.assertNotContains(response, 'pagination')
+        self.assertEqual(
+            [post.pk for post in response.context['page_obj']],
+            [post.pk for post in self.posts[:1:-1]]
+        )
+        response = self.client.get(url, {'before': response['X-Next-Cursor']})
+        self.assertNotIn('X-Next-Cursor', response)
+        self.assertContains(response, 'Пост 0')
+        self.assertNotContains(response, 'Пост 2')
+
+    def test_new_and_deleted_posts_do_not_shift_the_cursor(self):
+        url = reverse('posts:index_fragment')
+        cursor = self.client.get(url)['X-Next-Cursor']
+        Post.objects.create(author=self.author, text='Свежий пост')
+        self.posts[4].delete()
+        response = self.client.get(url, {'before': cursor})
+        self.assertEqual(
+            [post.pk for post in response.context['page_obj']],
+            [self.posts[1].pk, self.posts[0].pk]
+        )
+
+    def test_posts_published_at_once_are_neither_repeated_nor_skipped(self):
+        Post.objects.update(pub_date=self.posts[0].pub_date)
+        url = reverse('posts:index_fragment')
+        response = self.client.get(url)
+        seen = [post.pk for post in response.context['page_obj']]
+        response = self.client.get(url, {'before': response['X-Next-Cursor']})
+        seen += [post.pk for post in response.context['page_obj']]
+        self.assertEqual(seen, [post.pk for post in reversed(self.posts)])
+
+    def test_malformed_cursor_is_400(self):
+        url = reverse('posts:index_fragment')
+        for cursor in ('', '3', 'yesterday,3', '2021-01-01T00:00:00,3',
+                       f'{self.posts[2].pub_date.isoformat()},x'):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(url, {'before': cursor})
+                self.assertEqual(response.status_code, 400)
+
+    def test_profile_fragment(self):
+        response = self.client.get(
+            reverse('posts:profile_fragment', args=['author']),
+            {'before': self.cursor(self.posts[2])}
+        )
+        self.assertEqual(len(response.context['page_obj']), 2)
+
+    def test_follow_fragment_requires_login(self):
+        url = reverse('posts:follow_fragment')
+        self.assertEqual(self.client.get(url).status_code, 302)
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.client.force_login(self.reader)
+        response = self.client.get(url)
+        self.assertEqual(response['X-Next-Cursor'], self.cursor(self.posts[2]))
+        self.assertContains(response, 'Пост 4')
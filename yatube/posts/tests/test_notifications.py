@@ -0,0 +1,87 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Follow, Group, Post
+
+User = get_user_model()
+
+
+class NewPostsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        self.group = Group.objects.create(title='Группа', slug='group')
+        Post.objects.create(author=self.author, group=self.group, text='Пост')
+        self.client = Client()
+
+    def poll(self, name, *args, **params):
+        response = self.client.get(reverse(name, args=args), params)
+        return json.loads(response.content)
+
+    def test_counts_posts_since_cursor_without_database(self):
+        cursor = self.poll('posts:index_new_posts')['cursor']
+        Post.objects.create(author=self.author, text='Новый')
+        Post.objects.create(author=self.reader, text='Ещё один')
+        with self.assertNumQueries(0):
+            data = self.poll('posts:index_new_posts', cursor=cursor)
+        self.assertEqual(data, {'cursor': cursor, 'new': 2})
+
+    def test_group_counts_only_its_posts(self):
+        cursor = self.poll('posts:group_new_posts', 'group')['cursor']
+        Post.objects.create(author=self.author, text='Без группы')
+        Post.objects.create(author=self.author, group=self.group, text='В')
+        data = self.poll('posts:group_new_posts', 'group', cursor=cursor)
+        self.assertEqual(data['new'], 1)
+
+    def test_follow_counts_followed_authors(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.client.force_login(self.reader)
+        response = self.client.get(reverse('posts:follow_index'))
+        url = response.context['new_posts']
+        Post.objects.create(author=self.author, text='Новый')
+        Post.objects.create(author=self.reader, text='Свой')
+        self.assertEqual(json.loads(self.client.get(url).content)['new'], 1)
+
+    def test_follow_stream_without_database(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.client.force_login(self.reader)
+        url = self.client.get(reverse('posts:follow_index')).context[
+            'new_posts'
+        ]
+        Post.objects.create(author=self.author, text='Новый')
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                url, HTTP_ACCEPT='text/event-stream'
+            )
+        self.assertIn('"new": 1', response.content.decode())
+
+    def test_follow_poll_needs_signed_authors(self):
+        url = reverse('posts:follow_new_posts')
+        self.assertEqual(self.client.get(url).status_code, 403)
+        response = self.client.get(url, {'authors': f'[{self.author.pk}]'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_index_notice_is_not_cached_with_the_cards(self):
+        self.client.force_login(self.reader)
+        self.client.get(reverse('posts:index'))
+        Post.objects.create(author=self.author, text='Новый')
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(
+            response, f'data-new-posts="{response.context["new_posts"]}"'
+        )
+
+    def test_event_stream(self):
+        response = self.client.get(
+            reverse('posts:index_new_posts'), {'cursor': 0},
+            HTTP_ACCEPT='text/event-stream'
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(
+            response.content.decode(),
+            'retry: 15000\ndata: {"cursor": 0, "new": 1}\n\n'
+        )
@@ -0,0 +1,72 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import pagecache
+
+from ..models import Follow, Post
+
+User = get_user_model()
+
+
+@override_settings(PAGE_CACHE_ENABLED=True)
+class AnonymousPageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(author=cls.author, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.url = reverse('posts:profile', args=[self.author.username])
+
+    def test_anonymous_pages_cached(self):
+        response = self.guest_client.get(self.url)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        response = self.guest_client.get(self.url)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertContains(response, 'Тестовый пост')
+
+    def test_authorized_requests_bypass_cache(self):
+        client = Client()
+        client.force_login(self.author)
+        client.get(self.url)
+        response = client.get(self.url)
+        self.assertFalse(response.has_header('X-Page-Cache'))
+
+    def test_model_signals_invalidate_pages(self):
+        self.guest_client.get(self.url)
+        Post.objects.create(author=self.author, text='Новый пост')
+        response = self.guest_client.get(self.url)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertContains(response, 'Новый пост')
+
+    def test_logins_and_follows_keep_pages(self):
+        self.guest_client.get(self.url)
+        reader = User.objects.create_user(username='reader')
+        update_last_login(None, self.author)
+        Follow.objects.create(user=reader, author=self.author)
+        response = self.guest_client.get(self.url)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        update_last_login(None, reader)
+        Follow.objects.filter(user=reader).delete()
+        response = self.guest_client.get(self.url)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+
+    @override_settings(PAGE_CACHE_TTLS={'posts:profile': 0})
+    def test_stale_page_served_while_refreshing(self):
+        self.guest_client.get(self.url)
+        with mock.patch.object(pagecache.executor, 'submit') as submit:
+            response = self.guest_client.get(self.url)
+            self.guest_client.get(self.url)
+        self.assertEqual(response['X-Page-Cache'], 'stale')
+        submit.assert_called_once()
+        refresh, *args = submit.call_args[0]
+        refresh(*args)
+        self.assertIsNone(cache.get(args[1] + '.refresh'))
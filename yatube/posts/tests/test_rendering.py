@@ -0,0 +1,59 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import archive, rendering
+from ..models import ArchivedPost, Post
+
+User = get_user_model()
+
+
+@override_settings(POST_EXCERPT_LENGTH=10)
+class PostRenderingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+
+    def setUp(self):
+        self.post = Post.objects.create(
+            author=self.author, text='<b>Первая</b>\n\nВторая строка'
+        )
+
+    def test_html_stored_on_save(self):
+        self.assertEqual(
+            self.post.text_html,
+            '<p>&lt;b&gt;Первая&lt;/b&gt;</p>\n\n<p>Вторая строка</p>'
+        )
+        self.assertEqual(self.post.excerpt_html, '<p>&lt;b&gt;Первая…</p>')
+        self.assertEqual(self.post.render_version, rendering.VERSION)
+        response = Client().get(
+            reverse('posts:post_detail', args=[self.post.pk])
+        )
+        self.assertContains(response, self.post.text_html, html=True)
+
+    def test_backfill_renders_stale_posts(self):
+        Post.objects.filter(pk=self.post.pk).update(
+            text_html='', excerpt_html='', render_version=0
+        )
+        out = StringIO()
+        call_command('render_posts', stdout=out)
+        self.assertIn('Posts rendered: 1', out.getvalue())
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(post.text_html, self.post.text_html)
+        self.assertEqual(post.render_version, rendering.VERSION)
+        call_command('render_posts', stdout=out)
+        self.assertIn('Posts rendered: 0', out.getvalue())
+
+    def test_backfill_renders_archived_posts(self):
+        archive.move(Post.objects.filter(pk=self.post.pk))
+        ArchivedPost.objects.filter(pk=self.post.pk).update(
+            text_html='', excerpt_html='', render_version=0
+        )
+        self.assertEqual(rendering.backfill(), 1)
+        post = ArchivedPost.objects.get(pk=self.post.pk)
+        self.assertEqual(post.text_html, self.post.text_html)
+        self.assertEqual(post.render_version, rendering.VERSION)
@@ -0,0 +1,131 @@
+from datetime import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import archive, bulk, rollups
+from ..models import Group, Post, PostRollup
+
+User = get_user_model()
+
+
+def month_count(scope, scope_id=0, year=2021, month=3):
+    rollup = PostRollup.objects.filter(
+        scope=scope, scope_id=scope_id, period=PostRollup.MONTH,
+        start=datetime(year, month, 1).date()
+    ).first()
+    return rollup.posts if rollup else 0
+
+
+class PostRollupTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.group = Group.objects.create(title='Группа', slug='group')
+        self.other = Group.objects.create(title='Другая', slug='other')
+        self.posts = [
+            self.create(f'Пост {number}', datetime(2021, 3, 10 + number))
+            for number in range(3)
+        ]
+        rollups.rebuild()
+
+    def create(self, text, published):
+        # pub_date is auto_now_add, so backdate the row afterwards.
+        post = Post.objects.create(
+            author=self.author, group=self.group, text=text
+        )
+        Post.objects.filter(pk=post.pk).update(
+            pub_date=timezone.make_aware(published)
+        )
+        post.refresh_from_db()
+        return post
+
+    def test_create_and_delete_update_counters(self):
+        self.assertEqual(month_count(PostRollup.ALL), 3)
+        self.assertEqual(month_count(PostRollup.GROUP, self.group.pk), 3)
+        self.assertEqual(month_count(PostRollup.AUTHOR, self.author.pk), 3)
+        self.posts[0].delete()
+        self.assertEqual(month_count(PostRollup.ALL), 2)
+        self.assertEqual(
+            PostRollup.objects.get(
+                scope=PostRollup.ALL, period=PostRollup.DAY,
+                start=datetime(2021, 3, 10).date()
+            ).posts,
+            0
+        )
+
+    def test_group_change_moves_counters(self):
+        self.posts[0].group = self.other
+        self.posts[0].save()
+        self.assertEqual(month_count(PostRollup.GROUP, self.group.pk), 2)
+        self.assertEqual(month_count(PostRollup.GROUP, self.other.pk), 1)
+        self.assertEqual(month_count(PostRollup.ALL), 3)
+
+    def test_group_of_loaded_posts_is_known_without_queries(self):
+        post = Post.objects.get(pk=self.posts[0].pk)
+        post.group = self.other
+        post.save()
+        post.group = self.group
+        post.save()
+        self.assertEqual(month_count(PostRollup.GROUP, self.group.pk), 3)
+        self.assertEqual(month_count(PostRollup.GROUP, self.other.pk), 0)
+        post = Post.objects.only('text').get(pk=post.pk)
+        post.text = 'Без группы в памяти'
+        post.save()
+        self.assertEqual(month_count(PostRollup.GROUP, self.group.pk), 3)
+
+    def test_bulk_paths_update_counters(self):
+        bulk.reassign_group(Post.objects.filter(pk=self.posts[1].pk),
+                            self.other)
+        self.assertEqual(month_count(PostRollup.GROUP, self.other.pk), 1)
+        bulk.delete_posts(Post.objects.all())
+        self.assertEqual(month_count(PostRollup.ALL), 0)
+        self.assertEqual(month_count(PostRollup.GROUP, self.other.pk), 0)
+
+    def test_month_page_lists_hot_and_archived_posts(self):
+        archive.move(Post.objects.filter(pk=self.posts[0].pk))
+        self.create('Апрель', datetime(2021, 4, 1))
+        rollups.rebuild()
+        response = Client().get(
+            reverse('posts:group_date_archive', args=['group', 2021, 3])
+        )
+        self.assertEqual(
+            [post.pk for post in response.context['page_obj']],
+            [self.posts[2].pk, self.posts[1].pk, self.posts[0].pk]
+        )
+        self.assertEqual(
+            [(start.month, posts)
+             for start, posts, _ in response.context['months']],
+            [(4, 1), (3, 3)]
+        )
+        self.assertEqual(len(response.context['days']), 3)
+
+    def test_rebuild_command_recounts(self):
+        PostRollup.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_rollups', '--batch-size=1', stdout=out)
+        self.assertIn('Rollups rebuilt: 12', out.getvalue())
+        self.assertEqual(month_count(PostRollup.AUTHOR, self.author.pk), 3)
+
+    def test_last_month_a_date_can_hold(self):
+        client = Client()
+        for name, args in (
+            ('posts:date_archive', []),
+            ('posts:group_date_archive', ['group']),
+            ('posts:profile_date_archive', [self.author.username]),
+        ):
+            with self.subTest(name=name):
+                response = client.get(reverse(name, args=[*args, 9999, 12]))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.context['page_obj']), 0)
+
+    def test_invalid_month_is_404(self):
+        response = Client().get(
+            reverse('posts:date_archive', args=[2021, 13])
+        )
+        self.assertEqual(response.status_code, 404)
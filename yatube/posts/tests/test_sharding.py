@@ -0,0 +1,145 @@
+from http import HTTPStatus
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import sharding
+from ..models import Comment, Follow, Group, Post, PostRollup
+
+User = get_user_model()
+
+SHARDS = ['shard_0', 'shard_1']
+
+
+@override_settings(POST_SHARDS=SHARDS)
+class ShardingTest(TestCase):
+    databases = {'default', *SHARDS}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        sharding.prepare_shards()
+        cls.first = User.objects.create_user(username='first')
+        cls.second = User.objects.create_user(username='second')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.old_post = Post.objects.create(
+            author=cls.first, text='Старый пост', group=cls.group
+        )
+        cls.new_post = Post.objects.create(
+            author=cls.second, text='Новый пост', group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.first)
+
+    def test_posts_stored_on_author_shard(self):
+        for post in (self.old_post, self.new_post):
+            with self.subTest(post=post):
+                shard = sharding.shard_for_author(post.author_id)
+                self.assertEqual(post._state.db, shard)
+                self.assertEqual(sharding.shard_for_post(post.pk), shard)
+                self.assertFalse(Post.objects.using('default').exists())
+
+    def test_post_ids_do_not_collide(self):
+        second_shard = self.new_post if (
+            self.new_post._state.db == 'shard_1') else self.old_post
+        self.assertGreater(second_shard.pk, settings.POST_SHARD_ID_RANGE)
+
+    def test_feeds_merge_shards_on_pub_date(self):
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(
+                    list(response.context['page_obj']),
+                    [self.new_post, self.old_post]
+                )
+
+    def test_follow_index_reads_followed_shards(self):
+        Follow.objects.create(user=self.first, author=self.second)
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(list(response.context['page_obj']), [self.new_post])
+
+    def test_profile_and_detail_use_single_shard(self):
+        response = self.client.get(
+            reverse('posts:profile', args=[self.second.username])
+        )
+        self.assertEqual(response.context['posts_amount'], 1)
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.new_post.pk])
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.context['post'], self.new_post)
+
+    def test_comment_stored_next_to_post(self):
+        self.client.post(
+            reverse('posts:add_comment', args=[self.new_post.pk]),
+            {'text': 'Комментарий'}
+        )
+        self.assertTrue(
+            Comment.objects.using(self.new_post._state.db)
+            .filter(post=self.new_post).exists()
+        )
+
+    def test_dangling_references_are_reported(self):
+        out = StringIO()
+        call_command('check_post_references', stdout=out)
+        self.assertIn('consistent', out.getvalue())
+        Post.objects.using(self.new_post._state.db).filter(
+            pk=self.new_post.pk
+        ).update(author_id=10 ** 6)
+        with self.assertRaises(CommandError):
+            call_command('check_post_references', stdout=out)
+        self.assertIn('posts.Post.author_id: missing 1000000', out.getvalue())
+
+    def assertReferencesConsistent(self):
+        self.assertEqual(
+            [missing for _, _, missing in sharding.dangling_references()],
+            [[], [], []]
+        )
+
+    def rollup_posts(self, scope, scope_id=0):
+        return sum(PostRollup.objects.filter(
+            scope=scope, scope_id=scope_id, period=PostRollup.MONTH
+        ).values_list('posts', flat=True))
+
+    def test_group_delete_ungroups_posts_on_every_shard(self):
+        self.group.delete()
+        for post in (self.old_post, self.new_post):
+            self.assertIsNone(
+                Post.objects.using(post._state.db).get(pk=post.pk).group_id
+            )
+        self.assertReferencesConsistent()
+        self.assertEqual(self.rollup_posts(PostRollup.ALL), 2)
+
+    def test_user_delete_removes_posts_and_comments_on_every_shard(self):
+        Comment.objects.create(
+            post=self.old_post, author=self.second, text='Комментарий'
+        )
+        self.second.delete()
+        for alias in SHARDS:
+            self.assertFalse(Post.objects.using(alias).filter(
+                author_id=self.second.pk
+            ).exists())
+            self.assertFalse(Comment.objects.using(alias).filter(
+                author_id=self.second.pk
+            ).exists())
+        self.assertReferencesConsistent()
+        self.assertEqual(self.rollup_posts(PostRollup.ALL), 1)
+        self.assertEqual(
+            self.rollup_posts(PostRollup.AUTHOR, self.second.pk), 0
+        )
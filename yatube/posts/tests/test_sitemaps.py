@@ -0,0 +1,116 @@
+import os
+import shutil
+import tempfile
+from glob import glob
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import bulk, sitemaps
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class SitemapTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.sitemap_dir = tempfile.mkdtemp()
+        cls.sitemap_settings = override_settings(
+            SITEMAP_DIR=cls.sitemap_dir, SITEMAP_SHARD_SIZE=2
+        )
+        cls.sitemap_settings.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.sitemap_settings.disable()
+        shutil.rmtree(cls.sitemap_dir, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.group = Group.objects.create(title='Группа', slug='group')
+        self.posts = [
+            Post.objects.create(author=self.author, text=f'Пост {number}')
+            for number in range(3)
+        ]
+        self.client = Client()
+
+    def shard_url(self, post):
+        return reverse(
+            'posts:sitemap', args=[sitemaps.POSTS, sitemaps.shard_of(post.pk)]
+        )
+
+    def read(self, url):
+        return b''.join(self.client.get(url).streaming_content).decode()
+
+    def test_index_lists_non_empty_shards(self):
+        response = self.client.get(reverse('posts:sitemap_index'))
+        self.assertEqual(response['Content-Type'], 'application/xml')
+        for post in self.posts:
+            self.assertContains(response, self.shard_url(post))
+        self.assertContains(
+            response, reverse('posts:sitemap', args=[sitemaps.GROUPS, 0])
+        )
+
+    def test_shard_is_rendered_once_until_it_changes(self):
+        post = self.posts[0]
+        url = self.shard_url(post)
+        self.assertIn(
+            reverse('posts:post_detail', args=[post.pk]), self.read(url)
+        )
+        with self.assertNumQueries(0):
+            self.read(url)
+        bulk.delete_posts(Post.objects.filter(pk=post.pk))
+        self.assertNotIn(
+            reverse('posts:post_detail', args=[post.pk]), self.read(url)
+        )
+        self.assertEqual(len(os.listdir(self.sitemap_dir)), 1)
+
+    def test_newer_file_of_another_worker_is_kept(self):
+        shard = sitemaps.shard_of(self.posts[0].pk)
+        newer = sitemaps.shard_file(sitemaps.POSTS, shard, 2 ** 62)
+        open(newer, 'w').close()
+        self.read(self.shard_url(self.posts[0]))
+        self.assertTrue(os.path.exists(newer))
+        os.remove(newer)
+
+    def test_other_sections_do_not_rerender_posts(self):
+        url = self.shard_url(self.posts[0])
+        self.read(url)
+        Group.objects.create(title='Другая', slug='other')
+        User.objects.create_user(username='reader')
+        with self.assertNumQueries(0):
+            self.read(url)
+
+    @override_settings(SITE_URL='https://yatube.example')
+    def test_locations_use_site_url(self):
+        response = self.client.get(
+            self.shard_url(self.posts[0]), HTTP_HOST='localhost'
+        )
+        content = b''.join(response.streaming_content).decode()
+        self.assertIn('https://yatube.example/posts/', content)
+        self.assertNotIn('localhost', content)
+
+    def test_unknown_section_is_404(self):
+        response = self.client.get(
+            reverse('posts:sitemap', args=['comments', 0])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_empty_shard_is_404_without_a_file_or_version(self):
+        shard = sitemaps.shard_of(self.posts[-1].pk) + 1000
+        response = self.client.get(
+            reverse('posts:sitemap', args=[sitemaps.POSTS, shard])
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(
+            glob(sitemaps.shard_file(sitemaps.POSTS, shard, '*')), []
+        )
+        self.assertIsNone(
+            cache.get(sitemaps.version_key(sitemaps.POSTS, shard))
+        )
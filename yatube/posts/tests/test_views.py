@@ -293,27 +293,27 @@ class CacheViewsTest(TestCase):
         cls.authorized_auth.force_login(cls.author)
 
     def test_cache_index(self):
-        response = CacheViewsTest.authorized_auth.get(reverse('posts:index'))
-        posts = response.content
+        CacheViewsTest.authorized_auth.get(reverse('posts:index'))
         Post.objects.create(
             text='Новый тестовый пост',
             author=CacheViewsTest.author,
         )
+        # The new-posts notice is rendered outside the cached cards.
         response_old = CacheViewsTest.authorized_auth.get(
             reverse('posts:index')
         )
-        old_posts = response_old.content
-        self.assertEqual(
-            old_posts,
-            posts,
-            'Не возвращает кэшированную страницу.'
+        self.assertNotContains(
+            response_old,
+            'Новый тестовый пост',
+            msg_prefix='Не возвращает кэшированную страницу.'
         )
         cache.clear()
         response_new = CacheViewsTest.authorized_auth.get(
             reverse('posts:index')
         )
-        new_posts = response_new.content
-        self.assertNotEqual(old_posts, new_posts, 'Нет сброса кэша.')
+        self.assertContains(
+            response_new, 'Новый тестовый пост', msg_prefix='Нет сброса кэша.'
+        )
 
 
 class FollowViewsTest(TestCase):
@@ -0,0 +1,74 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import sharding, warmup
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class WarmCacheCommandTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.create(
+            author=cls.author, text='Тестовый пост', group=cls.group
+        )
+
+    def test_warm_cache(self):
+        cache.clear()
+        out = StringIO()
+        call_command('warm_cache', '--pages=1', '--workers=1', stdout=out)
+        self.assertIn('pages rendered: 3, failed: 0', out.getvalue())
+        self.assertIsNotNone(
+            cache.get(make_template_fragment_key('index_page', [1]))
+        )
+
+    def test_popular_urls(self):
+        self.assertEqual(warmup.popular_urls(1, 10, 10), [
+            reverse('posts:index'),
+            reverse('posts:group_list', args=['test-slug']),
+            reverse('posts:profile', args=['author']),
+        ])
+
+
+SHARDS = ['shard_0', 'shard_1']
+
+
+@override_settings(POST_SHARDS=SHARDS)
+class ShardedWarmupTest(TestCase):
+    databases = {'default', *SHARDS}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        sharding.prepare_shards()
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        for username in ('first', 'second', 'third'):
+            author = User.objects.create_user(username=username)
+            Post.objects.create(author=author, text='Пост', group=cls.group)
+        Post.objects.create(author=author, text='Ещё пост')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_popular_pages_are_counted_on_every_shard(self):
+        self.assertEqual(warmup.popular_urls(1, 10, 1), [
+            reverse('posts:index'),
+            reverse('posts:group_list', args=['group']),
+            reverse('posts:profile', args=['third']),
+        ])
+        result = warmup.warm(pages=1, groups=10, profiles=1, workers=1)
+        self.assertEqual((result['pages'], result['failed']), (3, 0))
@@ -0,0 +1,143 @@
+import os
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import archive, writebehind
+from ..models import Comment, Follow, Post
+
+TEMP_JOURNAL_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+User = get_user_model()
+
+
+@override_settings(
+    WRITE_BEHIND_ENABLED=True,
+    WRITE_BEHIND_JOURNAL=os.path.join(TEMP_JOURNAL_DIR, 'journal.sqlite3'),
+)
+class WriteBehindTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.post = Post.objects.create(author=cls.author, text='Тестовый пост')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_JOURNAL_DIR, ignore_errors=True)
+
+    def setUp(self):
+        writebehind.flush()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_comment_is_pending_until_flush(self):
+        self.client.post(
+            reverse('posts:add_comment', args=[self.post.id]),
+            {'text': 'Отложенный комментарий'}
+        )
+        self.assertFalse(Comment.objects.exists())
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.id])
+        )
+        self.assertContains(response, 'Отложенный комментарий')
+        self.assertEqual(writebehind.flush(), 1)
+        self.assertTrue(
+            Comment.objects.filter(
+                post=self.post, author=self.reader,
+                text='Отложенный комментарий'
+            ).exists()
+        )
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.id])
+        )
+        self.assertEqual(response.context['pending_comments'], [])
+
+    def test_follow_and_unfollow_applied_in_order(self):
+        follow = reverse('posts:profile_follow', args=[self.author.username])
+        unfollow = reverse(
+            'posts:profile_unfollow', args=[self.author.username]
+        )
+        self.client.get(follow)
+        self.client.get(unfollow)
+        self.client.get(follow)
+        self.assertFalse(Follow.objects.exists())
+        writebehind.flush(batch_size=2)
+        self.assertTrue(
+            Follow.objects.filter(user=self.reader, author=self.author)
+            .exists()
+        )
+
+    def test_enqueue_is_not_blocked_while_a_batch_is_applied(self):
+        writebehind.enqueue(writebehind.FOLLOW, self.reader.pk, self.author.pk)
+        errors = []
+
+        def enqueue_from_request():
+            try:
+                writebehind.enqueue(
+                    writebehind.COMMENT, self.reader.pk, self.post.pk, 'Новый'
+                )
+            except Exception as error:
+                errors.append(error)
+
+        def apply_batch(rows):
+            if rows[0][1] != writebehind.FOLLOW:
+                return
+            thread = threading.Thread(target=enqueue_from_request)
+            thread.start()
+            thread.join(timeout=1)
+            self.assertFalse(thread.is_alive())
+
+        with mock.patch.object(writebehind, 'apply_batch', apply_batch):
+            self.assertEqual(writebehind.flush(batch_size=1), 2)
+        self.assertEqual(errors, [])
+
+    def test_archived_post_with_pending_comment(self):
+        post = Post.objects.create(author=self.author, text='Старый пост')
+        self.client.post(
+            reverse('posts:add_comment', args=[post.id]),
+            {'text': 'Отложенный комментарий'}
+        )
+        archive.move(Post.objects.filter(pk=post.pk))
+        response = self.client.get(
+            reverse('posts:post_detail', args=[post.id])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['archived'])
+        self.assertNotContains(
+            response, reverse('posts:add_comment', args=[post.id])
+        )
+        self.assertNotContains(
+            response, reverse('posts:post_edit', args=[post.id])
+        )
+        self.assertNotContains(response, 'Отложенный комментарий')
+
+    def test_failing_entry_does_not_block_the_queue(self):
+        writebehind.enqueue(
+            writebehind.COMMENT, self.reader.pk, self.post.pk, 'Сломанный'
+        )
+        writebehind.enqueue(writebehind.FOLLOW, self.reader.pk, self.author.pk)
+        apply = writebehind.apply
+
+        def fail_on_broken(kind, user_id, target_id, text):
+            if text == 'Сломанный':
+                raise ValueError(text)
+            apply(kind, user_id, target_id, text)
+
+        with mock.patch.object(writebehind, 'apply', fail_on_broken):
+            with self.assertLogs('posts.writebehind', 'ERROR'):
+                self.assertEqual(writebehind.flush(), 2)
+        self.assertFalse(Comment.objects.exists())
+        self.assertTrue(
+            Follow.objects.filter(user=self.reader, author=self.author)
+            .exists()
+        )
+        self.assertEqual(writebehind.flush(), 0)
@@ -1,13 +1,40 @@
 from django.urls import path
 
-from . import views
+from . import api, feeds, views
 
 app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('fragments/', views.index_fragment, name='index_fragment'),
+    path('new/', views.index_new_posts, name='index_new_posts'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path(
+        'group/<slug:slug>/fragments/',
+        views.group_fragment,
+        name='group_fragment'
+    ),
+    path(
+        'group/<slug:slug>/new/',
+        views.group_new_posts,
+        name='group_new_posts'
+    ),
+    path(
+        'group/<slug:slug>/follow/',
+        views.group_follow,
+        name='group_follow'
+    ),
+    path(
+        'group/<slug:slug>/unfollow/',
+        views.group_unfollow,
+        name='group_unfollow'
+    ),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path(
+        'profile/<str:username>/fragments/',
+        views.profile_fragment,
+        name='profile_fragment'
+    ),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('create/', views.post_create, name='post_create'),
@@ -16,6 +43,38 @@ urlpatterns = [
          name='add_comment'
          ),
     path('follow/', views.follow_index, name='follow_index'),
+    path(
+        'follow/fragments/',
+        views.follow_fragment,
+        name='follow_fragment'
+    ),
+    path('follow/new/', views.follow_new_posts, name='follow_new_posts'),
+    path('archive/', views.date_archive, name='date_archive'),
+    path(
+        'archive/<int:year>/<int:month>/',
+        views.date_archive,
+        name='date_archive'
+    ),
+    path(
+        'group/<slug:slug>/archive/',
+        views.group_date_archive,
+        name='group_date_archive'
+    ),
+    path(
+        'group/<slug:slug>/archive/<int:year>/<int:month>/',
+        views.group_date_archive,
+        name='group_date_archive'
+    ),
+    path(
+        'profile/<str:username>/archive/',
+        views.profile_date_archive,
+        name='profile_date_archive'
+    ),
+    path(
+        'profile/<str:username>/archive/<int:year>/<int:month>/',
+        views.profile_date_archive,
+        name='profile_date_archive'
+    ),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
@@ -26,4 +85,62 @@ urlpatterns = [
         views.profile_unfollow,
         name='profile_unfollow'
     ),
+    path('api/v1/posts/', api.posts, name='api_posts'),
+    path(
+        'api/v1/posts/<int:post_id>/comments/',
+        api.post_comments,
+        name='api_post_comments'
+    ),
+    path('api/v1/groups/', api.groups, name='api_groups'),
+    path(
+        'api/v1/groups/<slug:slug>/posts/',
+        api.group_posts,
+        name='api_group_posts'
+    ),
+    path(
+        'api/v1/profiles/<str:username>/',
+        api.profile,
+        name='api_profile'
+    ),
+    path(
+        'api/v1/profiles/<str:username>/posts/',
+        api.profile_posts,
+        name='api_profile_posts'
+    ),
+    path('sitemap.xml', views.sitemap_index, name='sitemap_index'),
+    path(
+        'sitemap-<str:section>-<int:shard>.xml',
+        views.sitemap,
+        name='sitemap'
+    ),
+    path(
+        'rss/', feeds.latest_posts, {'kind': 'rss'}, name='rss'
+    ),
+    path(
+        'group/<slug:slug>/rss/',
+        feeds.group_posts,
+        {'kind': 'rss'},
+        name='group_rss'
+    ),
+    path(
+        'profile/<str:username>/rss/',
+        feeds.author_posts,
+        {'kind': 'rss'},
+        name='profile_rss'
+    ),
+    path(
+        'atom/', feeds.latest_posts, {'kind': 'atom'}, name='atom'
+    ),
+    path(
+        'group/<slug:slug>/atom/',
+        feeds.group_posts,
+        {'kind': 'atom'},
+        name='group_atom'
+    ),
+    path(
+        'profile/<str:username>/atom/',
+        feeds.author_posts,
+        {'kind': 'atom'},
+        name='profile_atom'
+    ),
 ]
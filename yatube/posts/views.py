@@ -1,10 +1,29 @@
+import json
+from datetime import MAXYEAR, date, datetime, time
+from functools import partial
+
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.core import signing
 from django.core.paginator import Paginator
+from django.db.models import Q
+from django.http import (FileResponse, Http404, HttpResponse,
+                         HttpResponseBadRequest, HttpResponseForbidden,
+                         JsonResponse)
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.http import urlencode
+from django.views.decorators.http import require_POST
 
+from . import (archive, cards, catalog, following, notifications, rollups,
+               sharding, sitemaps, writebehind)
+from .feed_cache import FollowFeed
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post, User
+from .models import Post, PostRollup, User
+
+FOLLOW_NEW_POSTS_SALT = 'posts.follow_new_posts'
 
 
 def paginator(request, post_list):
@@ -14,52 +33,102 @@ def paginator(request, post_list):
     return page_obj
 
 
+def index_feed(*conditions):
+    if cards.is_enabled():
+        return cards.feed().filter(*conditions)
+    return sharding.scatter(Post.objects.filter(*conditions), 'author')
+
+
+def group_feed(group, *conditions):
+    if cards.is_enabled():
+        return cards.feed(group_id=group.pk).filter(*conditions)
+    return sharding.scatter(
+        Post.objects.filter(*conditions, group=group), 'author'
+    )
+
+
+def profile_feed(author, *conditions):
+    if cards.is_enabled():
+        post_list = cards.feed(author_id=author.pk)
+    else:
+        post_list = author.posts.all()
+    return archive.ChainedFeed(
+        post_list.filter(*conditions),
+        archive.posts().filter(*conditions, author=author)
+        .prefetch_related('author')
+    )
+
+
+def new_posts_url(name, keys, *args, **params):
+    params['cursor'] = notifications.high_water(keys)
+    return f'{reverse(name, args=args)}?{urlencode(params)}'
+
+
 def index(request):
-    post_list = Post.objects.select_related('author', 'group')
-    pages = paginator(request, post_list)
+    pages = paginator(request, index_feed())
     context = {
         'page_obj': pages,
+        'fragments': reverse('posts:index_fragment'),
+        'new_posts': new_posts_url(
+            'posts:index_new_posts', notifications.index_keys()
+        ),
     }
     return render(request, 'posts/index.html', context)
 
 
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.select_related('author')
+    group = catalog.get_or_404(slug)
+    posts = group_feed(group)
     pages = paginator(request, posts)
     context = {
         'group': group,
         'posts': posts,
         'page_obj': pages,
+        'fragments': reverse('posts:group_fragment', args=[slug]),
+        'new_posts': new_posts_url(
+            'posts:group_new_posts', notifications.group_keys(group), slug
+        ),
     }
     return render(request, 'posts/group_list.html', context)
 
 
 def profile(request, username):
     author = get_object_or_404(User, username=username)
-    posts_count = author.posts.count()
-    post_list = author.posts.select_related('group')
+    post_list = profile_feed(author)
     pages = paginator(request, post_list)
     context = {
         'author': author,
         'page_obj': pages,
-        'posts_amount': posts_count,
+        'posts_amount': post_list.count(),
+        'following': author.pk in following.for_request(request),
+        'fragments': reverse('posts:profile_fragment', args=[username]),
     }
     return render(request, 'posts/profile.html', context)
 
 
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = sharding.posts_by_id(post_id).filter(pk=post_id).first()
+    archived = post is None
+    if archived:
+        post = get_object_or_404(archive.posts(), pk=post_id)
     form = CommentForm()
-    count_post = post.author.posts.count()
-    comments = post.comments.select_related('author')
+    count_post = (
+        post.author.posts.count() + archive.count_for_author(post.author_id)
+    )
+    comments = sharding.related(post.comments.all(), 'author')
     context = {
         'author': post.author,
         'post': post,
         'count_post': count_post,
         'comments': comments,
         'form': form,
+        'archived': archived,
     }
+    # Archived posts take no comments, so nothing can be pending for them.
+    if writebehind.is_enabled() and not archived:
+        context['pending_comments'] = writebehind.pending_comments(
+            post, request.user
+        )
     return render(request, 'posts/post_detail.html', context)
 
 
@@ -76,7 +145,7 @@ def post_create(request):
 
 @login_required
 def post_edit(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(sharding.posts_by_id(post_id), pk=post_id)
     if post.author != request.user:
         return redirect('posts:post_detail', post_id=post_id)
 
@@ -98,8 +167,14 @@ def post_edit(request, post_id):
 
 @login_required
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(sharding.posts_by_id(post_id), id=post_id)
     form = CommentForm(request.POST or None)
+    if form.is_valid() and writebehind.is_enabled():
+        writebehind.enqueue(
+            writebehind.COMMENT, request.user.pk, post.pk,
+            form.cleaned_data['text']
+        )
+        return redirect('posts:post_detail', post_id=post_id)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
@@ -120,14 +195,15 @@ def add_comment(request, post_id):
 @login_required
 def follow_index(request):
     template = 'posts/follow.html'
-    posts = (
-        Post
-        .objects
-        .filter(author__following__user=request.user)
-        .select_related('author', 'group'))
-    pages = paginator(request, posts)
+    pages = paginator(request, FollowFeed(request.user))
+    authors = following.for_request(request)
     context = {
         'page_obj': pages,
+        'fragments': reverse('posts:follow_fragment'),
+        'new_posts': new_posts_url(
+            'posts:follow_new_posts', notifications.follow_keys(authors),
+            authors=signing.dumps(sorted(authors), salt=FOLLOW_NEW_POSTS_SALT)
+        ),
     }
     return render(request, template, context)
 
@@ -136,10 +212,12 @@ def follow_index(request):
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     if author != request.user:
-        Follow.objects.get_or_create(
-            user=request.user,
-            author=author
-        )
+        if writebehind.is_enabled():
+            writebehind.enqueue(
+                writebehind.FOLLOW, request.user.pk, author.pk
+            )
+        else:
+            following.follow(request.user, [author.pk])
     return redirect(
         'posts:profile',
         username=username
@@ -149,5 +227,227 @@ def profile_follow(request, username):
 @login_required
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
-    Follow.objects.filter(user=request.user, author=author).delete()
+    if writebehind.is_enabled():
+        writebehind.enqueue(writebehind.UNFOLLOW, request.user.pk, author.pk)
+        return redirect('posts:profile', username=username)
+    following.unfollow(request.user, [author.pk])
     return redirect('posts:profile', username=username)
+
+
+@login_required
+@require_POST
+def group_follow(request, slug):
+    group = catalog.get_or_404(slug)
+    authors = sharding.values(Post.objects.filter(group=group), 'author_id')
+    following.follow(request.user, authors)
+    return redirect('posts:group_list', slug=slug)
+
+
+@login_required
+@require_POST
+def group_unfollow(request, slug):
+    group = catalog.get_or_404(slug)
+    authors = sharding.values(Post.objects.filter(group=group), 'author_id')
+    following.unfollow(request.user, authors)
+    return redirect('posts:group_list', slug=slug)
+
+
+def older_than(cursor):
+    """Filter of the cards after ``<pub_date>,<pk>`` in feed order.
+
+    None when the cursor is malformed.
+    """
+    pub_date, _, pk = cursor.rpartition(',')
+    try:
+        pub_date = parse_datetime(pub_date)
+    except ValueError:
+        return None
+    if pub_date is None or timezone.is_naive(pub_date) or not pk.isdigit():
+        return None
+    return [Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)]
+
+
+def fragment(request, feed, **context):
+    """Cards after the ``before`` cursor without the surrounding page.
+
+    ``feed`` builds the post list from filter conditions. The cursor is
+    the pub_date and pk of the last card shown, so cards published or
+    deleted meanwhile neither repeat nor skip cards; the cursor of the
+    following cards comes in the X-Next-Cursor header, which is missing
+    after the last card. A malformed cursor is answered with 400, on
+    which the script falls back to the paginator.
+    """
+    conditions = []
+    if 'before' in request.GET:
+        conditions = older_than(request.GET['before'])
+        if conditions is None:
+            return HttpResponseBadRequest('Malformed cursor.')
+    size = settings.MAX_PAGE_AMOUNT
+    posts = list(feed(*conditions)[:size + 1])
+    context['page_obj'] = posts[:size]
+    response = render(request, 'posts/includes/post_items.html', context)
+    if len(posts) > size:
+        last = posts[size - 1]
+        response['X-Next-Cursor'] = f'{last.pub_date.isoformat()},{last.pk}'
+    return response
+
+
+def index_fragment(request):
+    return fragment(request, index_feed)
+
+
+def group_fragment(request, slug):
+    group = catalog.get_or_404(slug)
+    return fragment(request, partial(group_feed, group), follow_buttons=True)
+
+
+def profile_fragment(request, username):
+    author = get_object_or_404(User, username=username)
+    return fragment(request, partial(profile_feed, author))
+
+
+@login_required
+def follow_fragment(request):
+    return fragment(
+        request, FollowFeed(request.user).filter, follow_buttons=True
+    )
+
+
+def new_posts(request, keys):
+    """Number of new posts of a feed since ``cursor``, read from the cache.
+
+    EventSource clients get a single server-sent event and reconnect after
+    NEW_POSTS_RETRY milliseconds, so an idle client holds no worker.
+    """
+    mark = notifications.high_water(keys)
+    cursor = request.GET.get('cursor', '')
+    cursor = int(cursor) if cursor.isdigit() else mark
+    data = {'cursor': cursor, 'new': max(mark - cursor, 0)}
+    if 'text/event-stream' not in request.META.get('HTTP_ACCEPT', ''):
+        return JsonResponse(data)
+    response = HttpResponse(
+        f'retry: {settings.NEW_POSTS_RETRY}\ndata: {json.dumps(data)}\n\n',
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+def index_new_posts(request):
+    return new_posts(request, notifications.index_keys())
+
+
+def group_new_posts(request, slug):
+    group = catalog.get_or_404(slug)
+    return new_posts(request, notifications.group_keys(group))
+
+
+def follow_new_posts(request):
+    """New posts of the authors signed into the URL by follow_index.
+
+    The signature stands in for login_required, whose session and user
+    lookups would be the only queries of a poll.
+    """
+    try:
+        authors = signing.loads(
+            request.GET.get('authors', ''), salt=FOLLOW_NEW_POSTS_SALT
+        )
+    except signing.BadSignature:
+        return HttpResponseForbidden()
+    return new_posts(request, notifications.follow_keys(authors))
+
+
+def sitemap_index(request):
+    return render(
+        request, 'posts/sitemap_index.xml',
+        {'sitemaps': list(sitemaps.index())},
+        content_type='application/xml'
+    )
+
+
+def sitemap(request, section, shard):
+    # Versions and files are only made for shards that hold objects.
+    if (section not in sitemaps.SECTIONS
+            or shard not in sitemaps.shards(section)):
+        raise Http404('No such sitemap.')
+    return FileResponse(
+        sitemaps.open_shard(section, shard),
+        content_type='application/xml'
+    )
+
+
+def month_bounds(year, month):
+    """First day of a month and the aware bounds of its posts.
+
+    The upper bound is None for the last month a date can hold.
+    """
+    try:
+        first = date(year, month, 1)
+    except ValueError:
+        raise Http404('No such month.')
+    following_year, following_month = divmod(year * 12 + month, 12)
+    if following_year > MAXYEAR:
+        return first, [day_start(first), None]
+    return first, [
+        day_start(first),
+        day_start(date(following_year, following_month + 1, 1))
+    ]
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def month_page(request, scope, scope_id, title, url_name, url_args,
+               year=None, month=None, **filters):
+    """Month navigation from the rollups and the posts of one month."""
+    context = {
+        'title': title,
+        'months': [
+            (rollup.start, rollup.posts, reverse(
+                url_name,
+                args=[*url_args, rollup.start.year, rollup.start.month]
+            ))
+            for rollup in rollups.months(scope, scope_id)
+        ],
+    }
+    if year is not None:
+        first, (since, until) = month_bounds(year, month)
+        filters['pub_date__gte'] = since
+        if until is not None:
+            filters['pub_date__lt'] = until
+        post_list = archive.ChainedFeed(
+            sharding.scatter(Post.objects.filter(**filters), 'author'),
+            archive.posts().filter(**filters).prefetch_related('author')
+        )
+        context.update({
+            'month': first,
+            'days': rollups.days(scope, scope_id, year, month),
+            'page_obj': paginator(request, post_list),
+        })
+    return render(request, 'posts/date_archive.html', context)
+
+
+def date_archive(request, year=None, month=None):
+    return month_page(
+        request, PostRollup.ALL, 0, 'Архив записей', 'posts:date_archive',
+        [], year, month
+    )
+
+
+def group_date_archive(request, slug, year=None, month=None):
+    group = catalog.get_or_404(slug)
+    return month_page(
+        request, PostRollup.GROUP, group.pk, f'Архив группы {group.title}',
+        'posts:group_date_archive', [slug], year, month, group_id=group.pk
+    )
+
+
+def profile_date_archive(request, username, year=None, month=None):
+    author = get_object_or_404(User, username=username)
+    return month_page(
+        request, PostRollup.AUTHOR, author.pk,
+        f'Архив пользователя {author.get_full_name() or author.username}',
+        'posts:profile_date_archive', [username], year, month,
+        author_id=author.pk
+    )
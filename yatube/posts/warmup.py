@@ -0,0 +1,149 @@
+"""Cache warming after deploys and cache flushes."""
+import logging
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+
+from django.apps import apps
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.db import close_old_connections
+from django.db.models import Count
+from django.template import TemplateDoesNotExist, TemplateSyntaxError
+from django.template.loader import get_template
+from django.test import RequestFactory
+from django.urls import reverse
+
+from . import sharding
+from .cards import thumbnail_url
+from .models import Group, Post, User
+
+logger = logging.getLogger(__name__)
+
+
+def post_counts(field):
+    """Number of posts per value of ``field`` summed over every shard."""
+    counts = Counter()
+    for queryset in sharding.querysets(Post.objects.exclude(**{field: None})):
+        counts.update(dict(
+            queryset.order_by().values_list(field)
+            .annotate(posts_count=Count('pk'))
+        ))
+    return counts
+
+
+def busiest(model, field, counts, limit):
+    ids = [pk for pk, _ in counts.most_common(limit)]
+    names = dict(model.objects.filter(pk__in=ids).values_list('pk', field))
+    return [names[pk] for pk in ids if pk in names]
+
+
+def popular_urls(pages, groups, profiles):
+    """Index, group and profile pages, busiest feeds first."""
+    top_groups = busiest(Group, 'slug', post_counts('group_id'), groups)
+    top_authors = busiest(
+        User, 'username', post_counts('author_id'), profiles
+    )
+    feeds = [reverse('posts:index')]
+    feeds += [reverse('posts:group_list', args=[slug]) for slug in top_groups]
+    feeds += [
+        reverse('posts:profile', args=[username]) for username in top_authors
+    ]
+    return [
+        feed if page == 1 else f'{feed}?page={page}'
+        for feed in feeds
+        for page in range(1, pages + 1)
+    ]
+
+
+def template_names():
+    directories = [
+        directory
+        for engine in settings.TEMPLATES
+        for directory in engine.get('DIRS', [])
+    ] + [
+        os.path.join(config.path, 'templates')
+        for config in apps.get_app_configs()
+    ]
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if filename.endswith('.html'):
+                    yield os.path.relpath(
+                        os.path.join(root, filename), directory
+                    )
+
+
+def compile_templates():
+    compiled = 0
+    for name in sorted(set(template_names())):
+        try:
+            get_template(name)
+        except (TemplateDoesNotExist, TemplateSyntaxError):
+            logger.warning('Template %s was not compiled', name)
+            continue
+        compiled += 1
+    return compiled
+
+
+def prime_thumbnails(limit):
+    posts = chain.from_iterable(
+        queryset[:limit] for queryset in
+        sharding.querysets(Post.objects.exclude(image='').only('image'))
+    )
+    return sum(1 for post in islice(posts, limit) if thumbnail_url(post.image))
+
+
+def page_handler():
+    """The middleware chain of a live request, without its signals.
+
+    django.test.Client would disconnect close_old_connections from the
+    request signals of the whole process while it runs, under the feet
+    of the requests the worker serves meanwhile.
+    """
+    handler = BaseHandler()
+    handler.load_middleware()
+    return handler
+
+
+def render_page(handler, url):
+    try:
+        request = RequestFactory(HTTP_HOST=settings.ALLOWED_HOSTS[0]).get(url)
+        return handler.get_response(request).status_code
+    finally:
+        close_old_connections()
+
+
+def warm(pages=3, groups=10, profiles=10, thumbnails=50, workers=4):
+    """Compile templates, prime thumbnails and render popular pages."""
+    result = {
+        'templates': compile_templates(),
+        'thumbnails': prime_thumbnails(thumbnails),
+    }
+    urls = popular_urls(pages, groups, profiles)
+    handler = page_handler()
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            statuses = list(executor.map(
+                lambda url: render_page(handler, url), urls
+            ))
+    else:
+        statuses = [render_page(handler, url) for url in urls]
+    result['pages'] = statuses.count(200)
+    result['failed'] = len(statuses) - result['pages']
+    return result
+
+
+def warm_in_background():
+    def run():
+        try:
+            logger.info('Cache warmup finished: %s',
+                        warm(**settings.CACHE_WARMUP))
+        except Exception:
+            logger.exception('Cache warmup failed')
+        finally:
+            close_old_connections()
+
+    threading.Thread(target=run, name='cache-warmup', daemon=True).start()
@@ -0,0 +1,184 @@
+"""Write-behind path for comments and follows.
+
+Requests append to a local SQLite journal and return at once; a
+background thread claims the oldest journal entries, applies them to the
+main database in batched transactions and then removes them, so delivery
+is at-least-once across crashes. The journal is locked only while
+entries are claimed or removed, never while they are applied.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from . import following, sharding
+from .models import Comment, User
+
+logger = logging.getLogger(__name__)
+
+COMMENT = 'comment'
+FOLLOW = 'follow'
+UNFOLLOW = 'unfollow'
+
+_local = threading.local()
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def is_enabled():
+    return settings.WRITE_BEHIND_ENABLED
+
+
+def journal():
+    path = settings.WRITE_BEHIND_JOURNAL
+    if getattr(_local, 'path', None) != path:
+        connection = sqlite3.connect(path, isolation_level=None)
+        connection.execute('PRAGMA journal_mode = WAL')
+        connection.execute('PRAGMA synchronous = FULL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS journal ('
+            'id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, '
+            'user_id INTEGER NOT NULL, target_id INTEGER NOT NULL, '
+            'text TEXT, created REAL NOT NULL, claimed REAL)'
+        )
+        columns = {
+            row[1] for row in connection.execute('PRAGMA table_info(journal)')
+        }
+        if 'claimed' not in columns:
+            connection.execute('ALTER TABLE journal ADD COLUMN claimed REAL')
+        connection.execute(
+            'CREATE INDEX IF NOT EXISTS journal_target '
+            'ON journal (kind, target_id)'
+        )
+        _local.path, _local.connection = path, connection
+    return _local.connection
+
+
+def enqueue(kind, user_id, target_id, text=None):
+    journal().execute(
+        'INSERT INTO journal (kind, user_id, target_id, text, created) '
+        'VALUES (?, ?, ?, ?, ?)',
+        (kind, user_id, target_id, text, time.time())
+    )
+
+
+def pending_comments(post, user):
+    """Comments of ``user`` on ``post`` still waiting in the journal."""
+    if not user.is_authenticated:
+        return []
+    rows = journal().execute(
+        'SELECT text, created FROM journal '
+        'WHERE kind = ? AND target_id = ? AND user_id = ? ORDER BY id DESC',
+        (COMMENT, post.pk, user.pk)
+    )
+    return [
+        Comment(
+            post=post,
+            author=user,
+            text=text,
+            created=datetime.fromtimestamp(created, timezone.utc)
+        )
+        for text, created in rows
+    ]
+
+
+def apply(kind, user_id, target_id, text):
+    if kind == COMMENT:
+        # The post may have been deleted or archived since the request.
+        if not sharding.posts_by_id(target_id).filter(pk=target_id).exists():
+            logger.warning('Dropping comment on missing post %s', target_id)
+            return
+        Comment.objects.create(
+            post_id=target_id, author_id=user_id, text=text
+        )
+    elif kind == FOLLOW:
+        following.follow(User(pk=user_id), [target_id])
+    elif kind == UNFOLLOW:
+        following.unfollow(User(pk=user_id), [target_id])
+
+
+def apply_batch(rows):
+    try:
+        with transaction.atomic():
+            for row in rows:
+                apply(*row[1:])
+    except Exception:
+        # Retry one by one so that a single bad entry cannot block the
+        # queue, whether the database or the entry itself is at fault.
+        for row in rows:
+            try:
+                with transaction.atomic():
+                    apply(*row[1:])
+            except Exception:
+                logger.exception('Dropping write-behind entry %s', row)
+
+
+def claim(batch_size):
+    """Mark the oldest entries as being applied and return them.
+
+    Nothing is returned while entries claimed by another writer are not
+    older than WRITE_BEHIND_CLAIM_TIMEOUT, so entries are still applied
+    in order by a single writer at a time; an expired claim is taken
+    over after a crash.
+    """
+    now = time.time()
+    connection = journal()
+    connection.execute('BEGIN IMMEDIATE')
+    try:
+        busy = connection.execute(
+            'SELECT 1 FROM journal WHERE claimed > ? LIMIT 1',
+            (now - settings.WRITE_BEHIND_CLAIM_TIMEOUT,)
+        ).fetchone()
+        if busy:
+            return []
+        rows = connection.execute(
+            'SELECT id, kind, user_id, target_id, text FROM journal '
+            'ORDER BY id LIMIT ?', (batch_size,)
+        ).fetchall()
+        if rows:
+            connection.execute(
+                'UPDATE journal SET claimed = ? WHERE id <= ?',
+                (now, rows[-1][0])
+            )
+        return rows
+    finally:
+        connection.execute('COMMIT')
+
+
+def flush(batch_size=None):
+    """Apply pending entries; returns how many were processed."""
+    batch_size = batch_size or settings.WRITE_BEHIND_BATCH_SIZE
+    processed = 0
+    while True:
+        rows = claim(batch_size)
+        if not rows:
+            return processed
+        apply_batch(rows)
+        journal().execute('DELETE FROM journal WHERE id <= ?', (rows[-1][0],))
+        processed += len(rows)
+
+
+def run():
+    while True:
+        try:
+            if not flush():
+                time.sleep(settings.WRITE_BEHIND_INTERVAL)
+        except Exception:
+            logger.exception('Write-behind flush failed')
+            time.sleep(settings.WRITE_BEHIND_INTERVAL)
+        finally:
+            close_old_connections()
+
+
+def start():
+    global _writer
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(
+                target=run, name='write-behind', daemon=True
+            )
+            _writer.start()
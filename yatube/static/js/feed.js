@@ -0,0 +1,76 @@
+// Infinite scroll and new-post notices for the feeds. Pages keep their
+// paginator; where the feed article carries data-fragments, the paginator
+// is replaced with fetching only the next cards from the fragment
+// endpoint. data-new-posts elements subscribe to the new-post events.
+(function () {
+  'use strict';
+
+  function enhance(feed) {
+    var nav = feed.querySelector('nav');
+    var cursor = feed.dataset.cursor;
+    var loading = false;
+    var sentinel = document.createElement('div');
+    feed.appendChild(sentinel);
+
+    function load() {
+      if (loading || !cursor) {
+        return;
+      }
+      loading = true;
+      var url = feed.dataset.fragments + '?before=' + encodeURIComponent(cursor);
+      fetch(url, {credentials: 'same-origin'})
+        .then(function (response) {
+          if (!response.ok) {
+            throw new Error(response.status);
+          }
+          cursor = response.headers.get('X-Next-Cursor');
+          return response.text();
+        })
+        .then(function (html) {
+          sentinel.insertAdjacentHTML('beforebegin', '<hr>' + html);
+          loading = false;
+          if (!cursor) {
+            observer.disconnect();
+          }
+        })
+        .catch(function () {
+          // Fall back to the paginator the page was rendered with.
+          observer.disconnect();
+          if (nav) {
+            nav.hidden = false;
+          }
+        });
+    }
+
+    var observer = new IntersectionObserver(function (entries) {
+      if (entries.some(function (entry) { return entry.isIntersecting; })) {
+        load();
+      }
+    }, {rootMargin: '600px'});
+    if (nav) {
+      nav.hidden = true;
+    }
+    observer.observe(sentinel);
+  }
+
+  function subscribe(notice) {
+    var source = new EventSource(notice.dataset.newPosts);
+    source.onmessage = function (event) {
+      var count = JSON.parse(event.data).new;
+      if (count) {
+        notice.querySelector('span').textContent = count;
+        notice.hidden = false;
+      }
+    };
+  }
+
+  document.addEventListener('DOMContentLoaded', function () {
+    if ('EventSource' in window) {
+      document.querySelectorAll('[data-new-posts]').forEach(subscribe);
+    }
+    if (!('IntersectionObserver' in window) || !window.fetch) {
+      return;
+    }
+    document.querySelectorAll('article[data-fragments]').forEach(enhance);
+  });
+}());
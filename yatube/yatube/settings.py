@@ -51,7 +51,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.PrimaryPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.pagecache.AnonymousPageCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -79,6 +81,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.year.year',
+                'posts.context_processors.following',
             ]
         },
     }
@@ -94,9 +97,99 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+        'CONN_MAX_AGE': 60,
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db_replica.sqlite3'),
+        'CONN_MAX_AGE': 60,
+    },
+    'shard_0': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db_shard_0.sqlite3'),
+        'CONN_MAX_AGE': 60,
+    },
+    'shard_1': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db_shard_1.sqlite3'),
+        'CONN_MAX_AGE': 60,
+    },
+}
+
+# Aliases that serve reads; empty list sends every query to `default`.
+DATABASE_REPLICAS = []
+DATABASE_ROUTERS = [
+    'posts.archive.ArchiveRouter',
+    'posts.sharding.AuthorShardRouter',
+    'core.routers.PrimaryReplicaRouter',
+]
+REPLICA_STICKY_SECONDS = 10
+# Aliases holding posts and comments sharded by author, e.g.
+# ['shard_0', 'shard_1']; empty list keeps them in `default`.
+POST_SHARDS = []
+POST_SHARD_ID_RANGE = 10 ** 12
+
+# Applied on every new SQLite connection by core.db.tune_sqlite.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
 }
 
+# Comments and follows go through a local journal applied in batches
+# by a background thread (posts.writebehind).
+WRITE_BEHIND_ENABLED = False
+WRITE_BEHIND_JOURNAL = os.path.join(BASE_DIR, 'write_behind.sqlite3')
+WRITE_BEHIND_BATCH_SIZE = 100
+WRITE_BEHIND_INTERVAL = 0.5
+# Seconds after which entries claimed by a crashed writer are taken over.
+WRITE_BEHIND_CLAIM_TIMEOUT = 60
+
+# Feeds render from the flattened posts.PostCard table; run
+# `manage.py rebuild_post_cards` after switching it on.
+POST_CARDS_ENABLED = False
+POST_EXCERPT_LENGTH = 300
+
+# Admin changelists count at most this many rows; deeper pages are
+# reached through keyset navigation.
+ADMIN_COUNT_LIMIT = 10000
+# Rows per UPDATE/DELETE of the bulk admin actions (posts.bulk).
+BULK_ACTION_CHUNK_SIZE = 1000
+
+# `manage.py archive_posts` moves posts older than this many days with
+# their comments to the archive tables of POST_ARCHIVE_DATABASE.
+POST_ARCHIVE_AFTER_DAYS = 365
+POST_ARCHIVE_DATABASE = 'default'
+
+# Read-only JSON API: default and largest page of the json format and the
+# number of rows read from the database at a time.
+API_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 1000
+API_CHUNK_SIZE = 500
+
+# Milliseconds after which EventSource clients of the new-post endpoints
+# (posts.notifications) ask again.
+NEW_POSTS_RETRY = 15000
+
+# Scheme and host of the site in links that leave it: sitemaps and feeds
+# are cached, so they must not take the host of whichever request came
+# first.
+SITE_URL = 'http://localhost:8000'
+
+# posts.sitemaps: ids per sitemap shard (at most 50000 URLs each), where
+# rendered shards are kept and how long the list of shards is cached.
+SITEMAP_SHARD_SIZE = 10000
+SITEMAP_DIR = os.path.join(BASE_DIR, 'sitemaps')
+SITEMAP_INDEX_TIMEOUT = 60 * 60
+
+# posts.feeds: items per RSS/Atom feed and how long a rendered version of
+# a feed is kept.
+FEED_ITEMS = 20
+FEED_CACHE_TIMEOUT = 24 * 60 * 60
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -148,7 +241,60 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 CACHES = {
     'default': {
+        'BACKEND': 'core.cache.TwoTierCache',
+        'OPTIONS': {
+            'L2': 'shared',
+            'L1_TIMEOUT': 2,
+            'MAX_ENTRIES': 1000,
+        },
+    },
+    # Shared tier; point it to memcached or Redis when running several
+    # worker processes.
+    'shared': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+        'LOCATION': 'shared',
+    },
+}
+# core.stampede: stale entries are kept this many seconds past their
+# timeout, so they can be served while one request rebuilds them.
+SINGLE_FLIGHT_GRACE = 60
+SINGLE_FLIGHT_LOCK_TIMEOUT = 10
+SINGLE_FLIGHT_BETA = 1.0
+# Full-page cache for anonymous GETs (core.pagecache): fresh seconds per
+# URL name, then served stale while refreshed in the background.
+PAGE_CACHE_ENABLED = False
+PAGE_CACHE_TTLS = {
+    'posts:index': 20,
+    'posts:group_list': 60,
+    'posts:profile': 60,
+    'posts:post_detail': 60,
+    'posts:index_fragment': 20,
+    'posts:group_fragment': 60,
+    'posts:profile_fragment': 60,
+    'posts:date_archive': 300,
+    'posts:group_date_archive': 300,
+    'posts:profile_date_archive': 300,
+}
+PAGE_CACHE_STALE = 120
+PAGE_CACHE_REFRESH_WORKERS = 4
+# posts.feed_cache: ids of the first pages of every follow feed.
+FOLLOW_FEED_CACHED_PAGES = 3
+FOLLOW_FEED_CACHE_TIMEOUT = 5 * 60
+# posts.following: set of followed author ids per user.
+FOLLOWING_CACHE_TIMEOUT = 60 * 60
+# posts.warmup: `manage.py warm_cache` and the worker start hook in wsgi.py
+CACHE_WARMUP_ON_START = False
+CACHE_WARMUP = {
+    'pages': 3,
+    'groups': 10,
+    'profiles': 10,
+    'thumbnails': 50,
+    'workers': 4,
 }
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+# tracemalloc diagnostics: /diagnostics/memory/ and `kill -USR1 <pid>`
+MEMORY_DIAGNOSTICS_ENABLED = False
+MEMORY_DIAGNOSTICS_FRAMES = 1
+MEMORY_DIAGNOSTICS_TOP = 25
+MEMORY_DIAGNOSTICS_DUMP_DIR = os.path.join(BASE_DIR, 'memory_dumps')
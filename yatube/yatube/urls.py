@@ -27,6 +27,7 @@ urlpatterns = [
     path('', include('posts.urls', namespace='post')),
     path('admin/', admin.site.urls),
     path('about/', include('about.urls', namespace='about')),
+    path('diagnostics/', include('core.urls', namespace='core')),
 ]
 if settings.DEBUG:
     import debug_toolbar